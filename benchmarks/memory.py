@@ -0,0 +1,78 @@
+# Memory retained by the parsed tree of a generated large document:
+#
+#   python -m benchmarks.memory [--sections N]
+#
+# The document is compiled once under tracemalloc and measured after a
+#   garbage collection, while the document is still referenced.
+import argparse
+import gc
+import os
+import tempfile
+import time
+import tracemalloc
+
+from stx.compiling.compiler import compile_document
+
+SECTION = '''= Section {n}
+
+Some *strong* text, some _emphasized_ text and `code` in paragraph {n}.
+It links to [Section {n}] and continues with plain text.
+
+- First item with *style*
+- Second item
+- Third item
+
+|= Name | Value
+|- a{n} | b{n}
+|- c{n} | d{n}
+
+== Subsection {n}
+
+Closing paragraph of section {n}.
+
+'''
+
+
+def generate_document(sections: int) -> str:
+    return ''.join(SECTION.format(n=n) for n in range(sections))
+
+
+def count_components(document) -> int:
+    return sum(1 for _ in document.content.walk())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='STX tree memory.')
+    parser.add_argument('--sections', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, 'index.stx')
+
+        with open(file_path, mode='w') as stream:
+            stream.write(generate_document(args.sections))
+
+        start = time.perf_counter()
+        compile_document(file_path)
+        seconds = time.perf_counter() - start
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+
+        document = compile_document(file_path)
+
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+    components = count_components(document)
+
+    print(f'components  {components}')
+    print(f'retained    {retained / 1e6:.1f} MB'
+          f' ({retained / components:.0f} B per component)')
+    print(f'compile     {seconds:.2f} s (without tracemalloc)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# Parse time of generated documents and of the Content backtracking:
+#
+#   python -m benchmarks.parsing [--runs N]
+#
+# Only the parsing is timed, without linking or outputs. Content is the
+#   reader of the parser, alive() runs for every line of a block.
+import argparse
+import os
+import tempfile
+import timeit
+from contextlib import redirect_stdout
+from typing import Callable
+
+from stx.compiling.parsing.parser import CTX, capture
+from stx.compiling.reading.content import Content
+from stx.compiling.reading.reader import Reader
+from stx.document import Document
+from stx.utils.thread_context import context
+
+PARAGRAPH = 'Some *strong* text and _more_ text {n}.\nSecond line {n}.\n\n'
+
+TABLE = '|= A | B | C\n' + '|- a | b | c\n' * 12 + '\n'
+
+BOXES = '''@ref: box{n}
+{{{{{{ info
+Text of box {n}.
+}}}}}}
+
++++
+literal {n}
++++
+
+'''
+
+DOCUMENTS = [
+    ('6k paragraphs', PARAGRAPH, 6000),
+    ('400 tables x 13 rows', TABLE, 400),
+    ('1k boxes/attrs/literals', BOXES, 1000),
+]
+
+
+def parse_file(file_path: str):
+    document = Document(file_path)
+    reader = Reader()
+
+    context.push_reader(reader)
+
+    try:
+        reader.push_file(file_path)
+
+        capture(CTX(document, reader))
+    finally:
+        context.pop_reader()
+
+
+def best_of(runs: int, action: Callable[[], None], number=1) -> float:
+    return min(timeit.repeat(action, number=number, repeat=runs)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='STX parse time.')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, template, count in DOCUMENTS:
+            file_path = os.path.join(temp_dir, 'index.stx')
+
+            with open(file_path, mode='w') as stream:
+                stream.write(''.join(
+                    template.format(n=n) for n in range(count)))
+
+            with open(os.devnull, mode='w') as devnull:
+                with redirect_stdout(devnull):
+                    seconds = best_of(args.runs, lambda: parse_file(file_path))
+
+            print(f'{name:<28} {seconds * 1000:7.1f} ms')
+
+    content = Content('    text\n  text\n', 'benchmark')
+
+    def alive():
+        content.go_back(9)
+        content.alive(4)
+
+    def expect_end_of_line():
+        content.go_back(8)
+        content.expect_end_of_line()
+
+    for name, action in [('Content.alive', alive),
+                         ('Content.expect_end_of_line', expect_end_of_line)]:
+        seconds = best_of(args.runs, action, number=100000)
+
+        print(f'{name:<28} {seconds * 1e9:7.1f} ns')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# Startup time of the CLI:
+#
+#   python -m benchmarks.startup [--runs N]
+#
+# The eager scenario also loads what stx.app defers until it is needed
+#   (watchdog, the process pool, the classic theme assets and
+#   pkg_resources), so its difference with lazy is the time saved.
+#   The last one is a cold compile of a small document to HTML.
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+LAZY = '''
+import stx.app
+'''
+
+EAGER = '''
+import importlib
+
+import stx.app
+from stx.themes import registry as themes
+
+for name in ['pkg_resources', 'watchdog.observers',
+             'concurrent.futures.process']:
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+
+themes.get_theme('classic', 'html')
+'''
+
+VERSION = '''
+import sys
+
+from stx.app import cli
+
+sys.argv = ['stx', '--version']
+cli()
+'''
+
+COMPILE = '''
+import sys
+
+from stx.app import cli
+
+sys.argv = ['stx', {input_file!r}]
+cli()
+'''
+
+SCENARIOS = [
+    ('lazy', LAZY),
+    ('eager', EAGER),
+    ('stx --version', VERSION),
+]
+
+DOCUMENT = '''#title: Small
+
+#output: (format: html, target: `small.html`)
+
+= Introduction
+
+A *small* document with a _link_ to [the list](list).
+
+@ref: list
+- One
+- Two
+
+= Code
+
+{{{ code (lang: python)
+print('Hello')
+}}}
+'''
+
+
+def measure(code: str, runs: int) -> Tuple[float, float]:
+    times = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+
+        subprocess.run(
+            [sys.executable, '-c', code],
+            stdout=subprocess.DEVNULL,
+            check=True)
+
+        times.append(time.perf_counter() - start)
+
+    # Each run is a new process, the minimum is the least noisy
+    return min(times), statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='STX startup time.')
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, 'small.stx')
+
+        with open(input_file, mode='w') as stream:
+            stream.write(DOCUMENT)
+
+        scenarios = SCENARIOS + [
+            ('stx small.stx', COMPILE.format(input_file=input_file)),
+        ]
+
+        for name, code in scenarios:
+            best, median = measure(code, args.runs)
+
+            print(f'{name:<16} best {best * 1000:7.1f} ms'
+                  f'   median {median * 1000:7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,90 +1,365 @@
+import glob
+import json
 import os
-import threading
+import sys
 import time
 import traceback
+from concurrent.futures import Executor
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
 
 import click
-import pkg_resources
 from click import UsageError
 
-from watchdog.events import FileSystemEventHandler, FileSystemEvent
-from watchdog.observers import Observer
-
 from stx import logger
 from stx.compiling.compiler import compile_document
+from stx.compiling.outline import Outline, compile_outline
+from stx.compiling.parsing.units import UnitCache
+from stx.compiling.reading.location import keep_line_indexes
 from stx.document import Document
+from stx.functions.registry import FunctionCache
+from stx.grammars import registry as grammars
 from stx.outputs import OutputFile, OutputAction
+from stx.outputs.json.serializer import toc_elements_to_json
+from stx.utils.debounce import DebouncedTask
 from stx.utils.debug import see
+from stx.version import app_title, app_version
 
-app_name = 'stx'
-
-try:
-    app_version = pkg_resources.require(app_name)[0].version
-except pkg_resources.DistributionNotFound:
-    app_version = '?'
+DEFAULT_DEBOUNCE_DELAY = 0.1
 
-app_title = f'{app_name} {app_version}'
+CHANGE_EVENTS = {'created', 'modified', 'moved', 'deleted'}
 
 
-def process_file(input_file: str) -> Document:
+def process_file(
+        input_file: str,
+        cache: Optional[UnitCache] = None,
+        executor: Optional[Executor] = None,
+        debug_mode=False,
+        function_cache: Optional[FunctionCache] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+        write_deps=False) -> Document:
     logger.info(f'Processing file {see(input_file)}...')
 
-    document = compile_document(input_file)
+    # The outputs expand the locations of the compiled files
+    with keep_line_indexes():
+        document = compile_document(
+            input_file, cache, executor, function_cache, cancelled)
 
-    if len(document.actions) == 0:
-        logger.warning('No actions were registered.')
-    else:
-        for action in document.actions:
-            action.run()
+        if debug_mode:
+            log_function_timings(document)
+
+        if is_cancelled(cancelled):
+            logger.info('Skipping the outputs of an outdated build.')
+        elif len(document.actions) == 0:
+            logger.warning('No actions were registered.')
+        else:
+            for action in document.actions:
+                if is_cancelled(cancelled):
+                    logger.info('Skipping the outputs of an outdated build.')
+                    return document
+
+                action.run()
+
+            if write_deps:
+                write_dependency_file(document)
 
     return document
 
 
-def watch_file(input_file: str, debug_mode: bool):
-    ignored_files = set()
+def is_cancelled(cancelled: Optional[Callable[[], bool]]) -> bool:
+    return cancelled is not None and cancelled()
 
-    def refresh():
-        try:
-            document = process_file(input_file)
 
-            ignored_files.clear()
+def write_dependency_file(document: Document):
+    targets = get_output_files(document)
 
-            for action in document.actions:
-                if (isinstance(action, OutputAction)
-                        and isinstance(action.target, OutputFile)):
-                    ignored_files.add(
-                        os.path.abspath(action.target.file_path)
-                    )
+    if len(targets) == 0:
+        logger.warning('No output files to write the dependencies of.')
+        return
+
+    deps_path = os.path.splitext(document.source_file)[0] + '.d'
+    temp_path = f'{deps_path}.tmp'
+
+    with open(temp_path, mode='w') as stream:
+        document.dependencies.write_makefile(stream, targets)
+
+    os.replace(temp_path, deps_path)
+
+
+def get_output_files(document: Document) -> List[str]:
+    return [
+        action.target.file_path
+        for action in document.actions
+        if (isinstance(action, OutputAction)
+            and isinstance(action.target, OutputFile))
+    ]
+
+
+def log_function_timings(document: Document):
+    timings = sorted(
+        document.function_timings.items(),
+        key=lambda item: item[1].seconds,
+        reverse=True)
+
+    for key, timing in timings:
+        logger.debug(f'Function {see(key)}: {timing.count} call(s) '
+                     f'in {timing.seconds * 1000:.1f} ms')
+
+
+def print_outline(input_file: str):
+    # The log is not mixed with the outline
+    with redirect_stdout(sys.stderr):
+        outline = compile_outline(input_file)
+
+    print(json.dumps(outline_to_json(outline), indent=2))
+
+
+def outline_to_json(outline: Outline) -> dict:
+    return {
+        'file': outline.document.source_file,
+        'title': outline.document.title,
+        'elements': toc_elements_to_json(outline.toc.elements),
+        'refs': sorted(outline.refs),
+    }
+
+
+class BuildSummary:
+
+    def __init__(self, input_file: str):
+        self.input_file = input_file
+        self.seconds = 0.0
+        self.outputs: List[str] = []
+        self.error: Optional[str] = None
+        self.output = ''
+        self.errors = ''
+
+
+def build_document(
+        input_file: str,
+        cache: Optional[UnitCache] = None,
+        function_cache: Optional[FunctionCache] = None,
+        debug_mode=False,
+        write_deps=False) -> BuildSummary:
+    summary = BuildSummary(input_file)
+    start = time.perf_counter()
+
+    try:
+        document = process_file(
+            input_file, cache, None, debug_mode, function_cache,
+            write_deps=write_deps)
+
+        summary.outputs = get_output_files(document)
+    except Exception as e:
+        summary.error = str(e)
+
+        if debug_mode:
+            print(traceback.format_exc())
+
+    summary.seconds = time.perf_counter() - start
+
+    return summary
+
+
+# Caches of the batch worker processes, kept between documents
+_worker_cache: Optional[UnitCache] = None
+_worker_function_cache: Optional[FunctionCache] = None
+_worker_write_deps = False
+
+
+def init_batch_worker(cache_dir: Optional[str], write_deps: bool):
+    global _worker_cache, _worker_function_cache, _worker_write_deps
+
+    if cache_dir is not None:
+        grammars.cache_directory = os.path.join(cache_dir, 'grammars')
+
+    _worker_cache = UnitCache(cache_dir, app_version)
+    _worker_function_cache = FunctionCache()
+    _worker_write_deps = write_deps
+
+
+def build_document_in_worker(
+        input_file: str, debug_mode: bool) -> BuildSummary:
+    output = StringIO()
+    errors = StringIO()
+
+    with redirect_stdout(output), redirect_stderr(errors):
+        summary = build_document(
+            input_file, _worker_cache, _worker_function_cache, debug_mode,
+            _worker_write_deps)
+
+    summary.output = output.getvalue()
+    summary.errors = errors.getvalue()
+
+    return summary
+
+
+def build_documents(
+        input_files: List[str],
+        debug_mode: bool,
+        cache_dir: Optional[str],
+        jobs: Optional[int] = None,
+        write_deps=False) -> Iterator[BuildSummary]:
+    if jobs is None or jobs <= 1:
+        # Grammars, themes and caches are loaded once for all documents
+        cache = UnitCache(cache_dir, app_version)
+        function_cache = FunctionCache()
+
+        for input_file in input_files:
+            yield build_document(
+                input_file, cache, function_cache, debug_mode, write_deps)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+            jobs,
+            initializer=init_batch_worker,
+            initargs=(cache_dir, write_deps)) as executor:
+        futures = [
+            executor.submit(build_document_in_worker, input_file, debug_mode)
+            for input_file in input_files
+        ]
+
+        for future in futures:
+            summary = future.result()
+
+            # Logs are replayed in the order of the inputs
+            sys.stdout.write(summary.output)
+            sys.stderr.write(summary.errors)
+
+            yield summary
+
+
+def log_build_summaries(summaries: List[BuildSummary]) -> int:
+    failed = 0
+
+    for summary in summaries:
+        if summary.error is not None:
+            failed += 1
+            logger.warning(f'Failed {see(summary.input_file)} '
+                           f'in {summary.seconds:.2f}s: {summary.error}')
+        else:
+            logger.info(f'Built {see(summary.input_file)} '
+                        f'in {summary.seconds:.2f}s, '
+                        f'{len(summary.outputs)} output file(s).')
+
+    logger.info(f'{len(summaries) - failed} of {len(summaries)} '
+                f'document(s) built.')
+
+    return failed
+
+
+def expand_input_files(patterns: Iterable[str]) -> List[str]:
+    input_files = []
+
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            file_paths = sorted(glob.glob(pattern, recursive=True))
+
+            if len(file_paths) == 0:
+                raise UsageError(f'No files match {see(pattern)}.')
+        else:
+            file_paths = [pattern]
+
+        for file_path in file_paths:
+            file_path = os.path.abspath(file_path)
+
+            if file_path not in input_files:
+                input_files.append(file_path)
+
+    return input_files
+
+
+def watch_file(
+        input_file: str,
+        debug_mode: bool,
+        cache_dir: Optional[str] = None,
+        executor: Optional[Executor] = None,
+        debounce_delay: float = DEFAULT_DEBOUNCE_DELAY,
+        write_deps=False):
+    # Only needed in watch mode
+    from watchdog.events import FileSystemEventHandler, FileSystemEvent
+    from watchdog.observers import Observer
+
+    root_dir = os.path.dirname(input_file)
+
+    # Replaced after each build, the watcher thread only reads them
+    dependencies: Optional[Set[str]] = None
+    output_files: List[OutputFile] = []
+    watched_dirs = {root_dir}
+
+    # Included files are parsed again only when they change
+    cache = UnitCache(cache_dir, app_version)
+    function_cache = FunctionCache()
+    observer = Observer()
+
+    def refresh():
+        nonlocal dependencies, output_files
+
+        try:
+            document = process_file(
+                input_file, cache, executor, debug_mode, function_cache,
+                cancelled=rebuild.is_superseded, write_deps=write_deps)
         except Exception as e:
+            # Any change could fix it, e.g. creating a missing include
+            dependencies = None
+
             print(f'Error: {e}')
             if debug_mode:
                 print(traceback.format_exc())
+            return
+
+        dependencies = set(document.dependencies.get_files())
+        output_files = [
+            action.target
+            for action in document.actions
+            if (isinstance(action, OutputAction)
+                and isinstance(action.target, OutputFile))
+        ]
+
+        for dependency in dependencies:
+            dir_path = os.path.dirname(dependency)
+
+            if not any(is_inside(dir_path, d) for d in watched_dirs):
+                observer.schedule(handler, dir_path, recursive=True)
+                watched_dirs.add(dir_path)
+
+    def is_relevant(file_path: str) -> bool:
+        if dependencies is not None:
+            return any(
+                file_path == dependency or is_inside(file_path, dependency)
+                for dependency in dependencies)
+        elif cache_dir is not None and is_inside(file_path, cache_dir):
+            return False
+
+        return not any(
+            output_file.writes(file_path) for output_file in output_files)
 
     class Handler(FileSystemEventHandler):
 
-        def __init__(self):
-            self.lock = threading.Lock()
-
         def on_any_event(self, event: FileSystemEvent):
-            if event.is_directory:
+            # Reading the files while building also produces events
+            if event.is_directory or event.event_type not in CHANGE_EVENTS:
                 return
 
-            with self.lock:
-                src_file = os.path.abspath(event.src_path)
+            file_paths = [event.src_path, getattr(event, 'dest_path', '')]
 
-                if src_file not in ignored_files:
-                    logger.info(f'Detected change on: {src_file}')
+            for file_path in file_paths:
+                if file_path and is_relevant(os.path.abspath(file_path)):
+                    logger.info(f'Detected change on: {file_path}')
 
-                    refresh()
+                    rebuild.trigger()
+                    return
 
-    refresh()
+    handler = Handler()
+    rebuild = DebouncedTask(refresh, debounce_delay)
 
-    root_dir = os.path.dirname(input_file)
+    refresh()
 
     logger.info(f'Watching directory {see(root_dir)} for changes...')
 
-    observer = Observer()
-    observer.schedule(Handler(), root_dir, recursive=True)
+    observer.schedule(handler, root_dir, recursive=True)
     observer.start()
     try:
         while True:
@@ -93,33 +368,184 @@ def watch_file(input_file: str, debug_mode: bool):
         logger.info('Stopping watch...')
         observer.stop()
     observer.join()
-
-
-def main(input_file: str, watch_mode=False, version=False, debug_mode=False):
-    if version:
+    rebuild.close()
+
+
+def is_inside(file_path: str, dir_path: str) -> bool:
+    return file_path.startswith(os.path.join(dir_path, ''))
+
+
+def main(
+        input_files: List[str],
+        watch_mode=False,
+        version=False,
+        debug_mode=False,
+        cache_dir: Optional[str] = None,
+        parallel=False,
+        jobs: Optional[int] = None,
+        serve_mode=False,
+        socket_path: Optional[str] = None,
+        debounce_delay: float = DEFAULT_DEBOUNCE_DELAY,
+        write_deps=False,
+        outline_mode=False):
+    if serve_mode:
+        if len(input_files) > 0 or watch_mode or jobs is not None:
+            raise UsageError('The server takes its inputs from the requests.')
+
+        serve(cache_dir, socket_path)
+        return
+    elif socket_path is not None:
+        raise UsageError('The socket option requires --serve.')
+    elif version:
         print(app_title)
-    elif input_file == '':
+
+        if len(input_files) == 0:
+            return
+    elif len(input_files) == 0:
         raise UsageError('Missing input file.')
 
-    input_file = os.path.abspath(input_file)
+    batch_mode = jobs is not None or len(input_files) > 1 or any(
+        glob.has_magic(input_file) for input_file in input_files)
+
+    input_files = expand_input_files(input_files)
+
+    if outline_mode:
+        if watch_mode:
+            raise UsageError('The outline cannot be watched.')
+
+        for input_file in input_files:
+            print_outline(input_file)
+
+        return
+
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir)
 
+        grammars.cache_directory = os.path.join(cache_dir, 'grammars')
+
+    if batch_mode:
+        if watch_mode:
+            raise UsageError('Only one input file can be watched.')
+        elif parallel:
+            raise UsageError('Use either --jobs or --parallel.')
+
+        summaries = list(build_documents(
+            input_files, debug_mode, cache_dir, jobs, write_deps))
+
+        if log_build_summaries(summaries) > 0:
+            sys.exit(1)
+
+        return
+
+    input_file = input_files[0]
+
+    if parallel:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor() as executor:
+            run(input_file, watch_mode, debug_mode, cache_dir, executor,
+                debounce_delay, write_deps)
+    else:
+        run(input_file, watch_mode, debug_mode, cache_dir,
+            debounce_delay=debounce_delay, write_deps=write_deps)
+
+
+def serve(cache_dir: Optional[str], socket_path: Optional[str]):
+    from stx.server import CompileServer, serve_socket, serve_stdio
+
+    if cache_dir is not None:
+        cache_dir = os.path.abspath(cache_dir)
+
+        grammars.cache_directory = os.path.join(cache_dir, 'grammars')
+
+    server = CompileServer(UnitCache(cache_dir, app_version))
+
+    if socket_path is not None:
+        serve_socket(server, socket_path)
+    else:
+        serve_stdio(server)
+
+
+def run(
+        input_file: str,
+        watch_mode: bool,
+        debug_mode: bool,
+        cache_dir: Optional[str],
+        executor: Optional[Executor] = None,
+        debounce_delay: float = DEFAULT_DEBOUNCE_DELAY,
+        write_deps=False):
     if watch_mode:
-        watch_file(input_file, debug_mode)
+        watch_file(
+            input_file, debug_mode, cache_dir, executor, debounce_delay,
+            write_deps)
+    elif cache_dir is not None:
+        process_file(
+            input_file,
+            UnitCache(cache_dir, app_version),
+            executor,
+            debug_mode,
+            write_deps=write_deps)
     else:
-        process_file(input_file)
+        process_file(
+            input_file,
+            executor=executor,
+            debug_mode=debug_mode,
+            write_deps=write_deps)
 
 
 @click.command(name='stx')
-@click.argument('input_file', default='')
+@click.argument('input_files', nargs=-1)
 @click.option(
     '-w', '--watch', help='Watches the document for changes.',
     is_flag=True, default=False)
+@click.option(
+    '--debounce', help='Waits MS milliseconds of quiet before rebuilding.',
+    metavar='MS', type=click.IntRange(min=0), default=100)
 @click.option(
     '-v', '--version', help='Shows the STX version.',
     is_flag=True, default=False)
 @click.option(
     '-d', '--debug', help='Enables debug mode.',
     is_flag=True, default=False)
-def cli(input_file: str, watch: bool, version: bool, debug):
-    """Processes the STX document indicated by INPUT_FILE."""
-    main(input_file, watch, version, debug)
+@click.option(
+    '-c', '--cache', help='Caches the parsed files in the directory CACHE.',
+    default=None)
+@click.option(
+    '-p', '--parallel', help='Parses the included files in parallel.',
+    is_flag=True, default=False)
+@click.option(
+    '-j', '--jobs', help='Builds the documents with N processes.',
+    metavar='N', type=click.IntRange(min=1), default=None)
+@click.option(
+    '-M', '--deps', help='Writes a Makefile dependency file for each input.',
+    is_flag=True, default=False)
+@click.option(
+    '-o', '--outline', help='Prints the sections and references as JSON.',
+    is_flag=True, default=False)
+@click.option(
+    '-s', '--serve',
+    help='Serves JSON-lines compile requests, one compile at a time.',
+    is_flag=True, default=False)
+@click.option(
+    '--socket', help='Serves on the Unix socket SOCKET instead of stdio.',
+    default=None)
+def cli(
+        input_files: Tuple[str, ...],
+        watch: bool,
+        debounce: int,
+        version: bool,
+        debug,
+        cache,
+        parallel: bool,
+        jobs: Optional[int],
+        deps: bool,
+        outline: bool,
+        serve: bool,
+        socket: Optional[str]):
+    """Processes the STX documents indicated by INPUT_FILES.
+
+    Several files or glob patterns are built in one process, printing
+    a summary of each document at the end.
+    """
+    main(list(input_files), watch, version, debug, cache, parallel, jobs,
+         serve, socket, debounce / 1000, deps, outline)
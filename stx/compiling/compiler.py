@@ -1,36 +1,80 @@
-from stx.compiling.linking.numbering import link_document_numbers
-from stx.compiling.linking.referencing import validate_references
-from stx.compiling.linking.referencing import auto_generate_special_references
+from concurrent.futures import Executor
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from stx.compiling.linking.linker import link_document
 from stx.compiling.parsing.parser import capture, CTX
-from stx.functions.core import resolve_document
+from stx.compiling.parsing.units import UnitCache
+from stx.compiling.reading.location import get_location_file
+from stx.compiling.reading.location import keep_line_indexes
 from stx.compiling.reading.reader import Reader
+from stx.components import Image
 from stx.document import Document
+from stx.functions.registry import FunctionCache
+from stx.utils.dependencies import IMAGE, STYLESHEET
+from stx.utils.files import resolve_sibling
 from stx.utils.thread_context import context
 
 
-def compile_document(file_path: str) -> Document:
+def compile_document(
+        file_path: str,
+        cache: Optional[UnitCache] = None,
+        executor: Optional[Executor] = None,
+        function_cache: Optional[FunctionCache] = None,
+        cancelled: Optional[Callable[[], bool]] = None) -> Document:
+    if executor is not None and cache is None:
+        # Included files are parsed in parallel as units
+        cache = UnitCache()
+
+    if function_cache is None:
+        # Repeated calls to pure functions are resolved once
+        function_cache = FunctionCache()
+
     doc = Document(file_path)
     reader = Reader()
-    ctx = CTX(doc, reader)
+    ctx = CTX(doc, reader, cache, executor=executor)
+
+    with keep_line_indexes():
+        context.push_reader(reader)
 
-    context.push_reader(reader)
+        try:
+            reader.push_file(file_path)
 
-    reader.push_file(file_path)
+            capture(ctx)
+        finally:
+            context.pop_reader()
 
-    capture(ctx)
+        if cancelled is not None and cancelled():
+            # A newer build replaces it, so it is not linked
+            return doc
 
-    context.pop_reader()
+        link_document(doc, function_cache)
 
-    auto_generate_special_references(doc)
+        add_reference_dependencies(doc)
 
-    while True:
-        link_document_numbers(doc)
+    return doc
 
-        resolved_components = resolve_document(doc)
 
-        validate_references(doc)
+def add_reference_dependencies(document: Document):
+    # Files that the outputs link to instead of reading them
+    for stylesheet in document.stylesheets:
+        if is_local_path(stylesheet):
+            document.dependencies.add(
+                document.source_file,
+                resolve_sibling(document.source_file, stylesheet),
+                STYLESHEET)
 
-        if resolved_components == 0:
-            break
+    for root in [document.header, document.content, document.footer]:
+        if root is None:
+            continue
 
-    return doc
+        for image in root.walk(types=Image, include_self=True):
+            if is_local_path(image.src):
+                document.dependencies.add(
+                    get_location_file(image.location),
+                    resolve_sibling(document.source_file, image.src),
+                    IMAGE)
+
+
+def is_local_path(path: str) -> bool:
+    return isinstance(path, str) and urlparse(path).scheme == ''
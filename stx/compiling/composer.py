@@ -18,7 +18,9 @@ class Composer:
         self.stack.append([])
 
     def pop(self) -> Optional[List[Component]]:
-        return self.stack.pop()
+        # Copied to drop the spare capacity of the appends, the lists
+        #   end up in the tree.
+        return list(self.stack.pop())
 
     @property
     def components(self) -> List[Component]:
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from stx import logger
+from stx.compiling.linking.referencing import make_ref
+from stx.compiling.linking.referencing import normalize_link
+from stx.compiling.linking.referencing import register_figure_reference
+from stx.compiling.linking.referencing import register_section_reference
+from stx.compiling.linking.referencing import register_table_reference
+from stx.compiling.reading.location import PackedLocation
+from stx.components import Component, Composite, Section, Table, Figure
+from stx.components import FunctionCall, LinkText
+from stx.document import Document
+from stx.functions.core import resolve_calls
+from stx.functions.registry import FunctionCache
+
+# Parent number, expected level and position inside a composite
+Numbering = Optional[Tuple[str, int, Optional[int]]]
+
+
+class LinkIndex:
+
+    def __init__(self):
+        self.refs: Set[str] = set()
+        self.ref_counts: Dict[str, int] = {}
+        self.links: List[LinkText] = []
+        self.calls: List[FunctionCall] = []
+        self.targets: List[Component] = []
+        self.warnings: List[Tuple[str, PackedLocation]] = []
+        self.figure_count = 1
+        self.table_count = 1
+
+
+def link_document(
+        document: Document, function_cache: Optional[FunctionCache] = None):
+    if document.content is None:
+        return
+
+    index = index_document(document.content)
+
+    if len(resolve_calls(
+            document, index.calls, defer=True, cache=function_cache)) > 0:
+        # The new components are numbered before the deferred calls
+        index = index_components(document.content, number=True)
+
+    deferred_ids = {id(call) for call in index.calls}
+
+    for call in resolve_calls(document, index.calls, cache=function_cache):
+        # Nested calls are already part of the result of their parent
+        if id(call) in deferred_ids:
+            index_components(call.result, index=index, include_root=True)
+
+    for message, location in index.warnings:
+        logger.warning(message, location)
+
+    for link in index.links:
+        normalize_link(link, index.refs)
+
+
+def index_document(content: Component) -> LinkIndex:
+    index = index_components(content, normalize=True, number=True)
+
+    for target in index.targets:
+        if isinstance(target, Section):
+            register_section_reference(target, index.refs, index.ref_counts)
+        elif isinstance(target, Table):
+            register_table_reference(target, index.refs, index.ref_counts)
+        elif isinstance(target, Figure):
+            register_figure_reference(target, index.refs, index.ref_counts)
+
+    return index
+
+
+def index_components(
+        root: Component,
+        normalize=False,
+        number=False,
+        index: Optional[LinkIndex] = None,
+        include_root=False) -> LinkIndex:
+    if index is None:
+        index = LinkIndex()
+
+    numberings: Dict[int, Numbering] = {}
+
+    if number:
+        numberings[id(root)] = ('', 1, None)
+
+    for component in root.walk(include_self=True):
+        if isinstance(component, FunctionCall) and component.result is None:
+            index.calls.append(component)
+
+        if include_root or component is not root:
+            index_component(index, component, normalize, number)
+
+        numbering = numberings.pop(id(component), None)
+
+        if numbering is not None:
+            number_component(index, component, numbering, numberings)
+
+    return index
+
+
+def index_component(
+        index: LinkIndex, component: Component, normalize: bool, number: bool):
+    if normalize:
+        wild_refs = component.get_refs()
+
+        if len(wild_refs) > 0:
+            component.ref = [
+                make_ref(wild_ref) for wild_ref in wild_refs
+            ]
+
+    for ref in component.get_refs():
+        if ref in index.refs:
+            raise component.error(f'Reference already taken: {ref}')
+        else:
+            index.refs.add(ref)
+
+    if isinstance(component, LinkText):
+        index.links.append(component)
+    elif normalize and isinstance(component, (Section, Table, Figure)):
+        # Targets of the auto-generated references
+        index.targets.append(component)
+
+    if not number:
+        return
+    elif isinstance(component, Table):
+        component.number = f'{index.table_count}.'
+
+        index.table_count += 1
+    elif isinstance(component, Figure):
+        component.number = f'{index.figure_count}.'
+
+        index.figure_count += 1
+
+
+def number_component(
+        index: LinkIndex,
+        component: Component,
+        numbering: Numbering,
+        numberings: Dict[int, Numbering]):
+    parent_number, current_level, position = numbering
+
+    if isinstance(component, Composite):
+        count = 1
+
+        for child in component.components:
+            if isinstance(child, Section):
+                numberings[id(child)] = (parent_number, current_level, count)
+
+                count += 1
+            else:
+                numberings[id(child)] = (parent_number, current_level, None)
+    elif isinstance(component, Section):
+        if position is not None:
+            component.number = parent_number + f'{position}.'
+
+            if component.level != current_level:
+                index.warnings.append((
+                    f'Expected section level {current_level}'
+                    f' instead of {component.level}.',
+                    component.location))
+        else:
+            component.number = parent_number + '1.'
+
+        numberings[id(component.content)] = (
+            component.number, current_level + 1, None)
@@ -1,9 +1,8 @@
 import string
-from typing import Set, Optional
+from typing import Dict, Optional, Set
 
 from stx import logger
 from stx.components import Component, Section, Table, Figure, LinkText
-from stx.document import Document
 from stx.utils.debug import see
 
 REF_LENGTH_HINT = 40
@@ -13,123 +12,77 @@ REF_LENGTH_HINT = 40
 #  normalization and validation.
 
 
-def auto_generate_special_references(document: Document):
-    roots = list()
-    refs = set()
-
-    if document.content is not None:
-        roots.append(document.content)
-
-    for root in roots:
-        normalize_references(root)
-
-    for root in roots:
-        collect_references(root, refs)
-
-    for root in roots:
-        register_missing_references(root, refs)
-
-
-def validate_references(document: Document):
-    roots = list()
-    refs = set()
-
-    if document.content is not None:
-        roots.append(document.content)
-
-    for root in roots:
-        collect_references(root, refs)
-
-    for root in roots:
-        normalize_and_report_invalid_links(root, refs)
-
-
-def collect_references(root: Component, refs: Set[str]):
-    for component in root.walk():
-        for ref in component.get_refs():
-            if ref in refs:
-                raise component.error(f'Reference already taken: {ref}')
-            else:
-                refs.add(ref)
-
-
-def normalize_references(root: Component):
-    for component in root.walk():
-        wild_refs = component.get_refs()
-
-        if len(wild_refs) > 0:
-            component.ref = [
-                make_ref(wild_ref) for wild_ref in wild_refs
-            ]
-
-
-def register_missing_references(root: Component, refs: Set[str]):
-    for component in root.walk():
-        if isinstance(component, Section):
-            register_section_reference(component, refs)
-        elif isinstance(component, Table):
-            register_table_reference(component, refs)
-        elif isinstance(component, Figure):
-            register_figure_reference(component, refs)
-
-
-def normalize_and_report_invalid_links(root: Component, refs: Set[str]):
-    for component in root.walk():
-        if isinstance(component, LinkText):
-            if component.reference is None:
-                # Generate reference from the text
-                component.reference = make_ref(component.get_text())
-            elif component.is_internal():
-                # Normalize wild reference
-                component.reference = make_ref(component.reference)
-            else:
-                # Do not validate this link
-                continue
+def normalize_link(link: LinkText, refs: Set[str]):
+    if link.reference is None:
+        # Generate reference from the text
+        link.reference = make_ref(link.get_text())
+    elif link.is_internal():
+        # Normalize wild reference
+        link.reference = make_ref(link.reference)
+    else:
+        # Do not validate this link
+        return
 
-            if component.reference not in refs:
-                component.invalid = True
-                logger.warning(
-                    f'Invalid link: {see(component.reference, None)}',
-                    component.location)
+    if link.reference not in refs:
+        link.invalid = True
+        logger.warning(
+            f'Invalid link: {see(link.reference, None)}',
+            link.location)
 
 
-def register_section_reference(section: Section, refs: Set[str]):
-    ref = generate_component_ref(section.heading, refs)
+def register_section_reference(
+        section: Section,
+        refs: Set[str],
+        counts: Optional[Dict[str, int]] = None):
+    ref = generate_component_ref(section.heading, refs, counts)
 
     section.add_ref(ref)
     refs.add(ref)
 
 
-def register_table_reference(table: Table, refs: Set[str]):
+def register_table_reference(
+        table: Table,
+        refs: Set[str],
+        counts: Optional[Dict[str, int]] = None):
     if table.caption is not None:
-        ref = generate_component_ref(table.caption, refs)
+        ref = generate_component_ref(table.caption, refs, counts)
     else:
-        ref = generate_component_ref(table, refs)
+        ref = generate_component_ref(table, refs, counts)
 
     table.add_ref(ref)
     refs.add(ref)
 
 
-def register_figure_reference(figure: Figure, refs: Set[str]):
-    ref = generate_component_ref(figure.caption, refs)
+def register_figure_reference(
+        figure: Figure,
+        refs: Set[str],
+        counts: Optional[Dict[str, int]] = None):
+    ref = generate_component_ref(figure.caption, refs, counts)
 
     figure.add_ref(ref)
     refs.add(ref)
 
 
-def generate_component_ref(component: Component, refs: Set[str]) -> str:
-    count = 0
+def generate_component_ref(
+        component: Component,
+        refs: Set[str],
+        counts: Optional[Dict[str, int]] = None) -> str:
+    # The count is only a suffix, so the text is converted once
+    base_ref = make_ref(component.get_text(), REF_LENGTH_HINT)
 
-    plain_text = component.get_text()
+    # The refs are never released, so the taken counts are skipped
+    count = counts.get(base_ref, 0) if counts is not None else 0
 
-    while True:
-        ref = make_ref(plain_text, REF_LENGTH_HINT, count)
-
-        if ref not in refs:
-            break
+    ref = add_ref_count(base_ref, count) if count > 0 else base_ref
 
+    while ref in refs:
         count += 1
 
+        ref = add_ref_count(base_ref, count)
+
+    if counts is not None:
+        counts[base_ref] = count
+
     return ref
 
 
@@ -151,9 +104,13 @@ def make_ref(
     ref = ''.join(result)
 
     if count is not None and count > 0:
-        if ref.endswith('-'):
-            ref += str(count)
-        else:
-            ref += f'-{count}'
+        ref = add_ref_count(ref, count)
 
     return ref
+
+
+def add_ref_count(ref: str, count: int) -> str:
+    if ref.endswith('-'):
+        return ref + str(count)
+
+    return f'{ref}-{count}'
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 # Block marks
 
@@ -85,12 +85,37 @@ style_token_map = {
 }
 
 
-def get_matching_mark(text: str, valid_marks: List[str]) -> Optional[str]:
-    for mark in valid_marks:
-        if text.startswith(mark):
-            return mark
+class MarkMatcher:
 
-    return None
+    def __init__(self, marks: List[str]):
+        self.marks = marks
+        self.first_chars = ''
+        self._candidates: Dict[str, List[str]] = {}
+
+        # Candidates keep the order of the marks,
+        #   so the first matching mark in the list wins.
+        for mark in marks:
+            first_char = mark[0]
+
+            if first_char not in self._candidates:
+                self._candidates[first_char] = []
+                self.first_chars += first_char
+
+            self._candidates[first_char].append(mark)
+
+    def match(
+            self,
+            text: str,
+            position: int,
+            end: Optional[int] = None) -> Optional[str]:
+        candidates = self._candidates.get(text[position:position + 1])
+
+        if candidates is not None:
+            for mark in candidates:
+                if text.startswith(mark, position, end):
+                    return mark
+
+        return None
 
 
 not_inline_marks = [
@@ -134,4 +159,10 @@ inline_marks = [
 
 all_marks = not_inline_marks + inline_marks
 
+not_inline_mark_matcher = MarkMatcher(not_inline_marks)
+
+inline_mark_matcher = MarkMatcher(inline_marks)
+
+all_mark_matcher = MarkMatcher(all_marks)
+
 mark_max_length = max(len(mark) for mark in all_marks)
@@ -0,0 +1,186 @@
+from typing import List, Optional, Set
+
+from stx.compiling.linking.linker import index_document
+from stx.compiling.parsing.events import BEGIN, BLOCK, CONTAINER, DIRECTIVE
+from stx.compiling.parsing.events import END, EventStream, LITERAL, SECTION
+from stx.compiling.parsing.events import build_component, build_range
+from stx.compiling.parsing.events import scan_file
+from stx.compiling.parsing.parser import CTX, add_include_dependencies
+from stx.compiling.parsing.parser import apply_directive, compose_component
+from stx.compiling.reading.location import PackedLocation
+from stx.compiling.reading.reader import Reader
+from stx.components import Component, Composite, Section, TableOfContents
+from stx.data_notation.parsing import parse_entry
+from stx.document import Document
+from stx.functions.built_in import generate_toc
+from stx.utils.files import resolve_include_files
+
+
+class Outline:
+
+    def __init__(
+            self,
+            document: Document,
+            toc: TableOfContents,
+            refs: Set[str]):
+        self.document = document
+        self.toc = toc
+        self.refs = refs
+
+
+def compile_outline(file_path: str) -> Outline:
+    document = Document(file_path)
+    builder = _OutlineBuilder(document)
+
+    builder.replay_file(file_path)
+
+    document.content = builder.close()
+
+    index_document(document.content)
+
+    toc = TableOfContents(document.content.location, None)
+
+    generate_toc(document, toc)
+
+    refs = {
+        ref
+        for component in document.content.walk(include_self=True)
+        for ref in component.get_refs()
+    }
+
+    return Outline(document, toc, refs)
+
+
+class _Level:
+
+    def __init__(
+            self,
+            location: PackedLocation,
+            section: Optional[Section] = None):
+        self.location = location
+        self.section = section
+        self.components: List[Component] = []
+
+    def compose(self) -> Component:
+        return compose_component(self.location, self.components)
+
+
+class _OutlineBuilder:
+
+    def __init__(self, document: Document):
+        self.document = document
+        self.ctx = CTX(document, Reader())
+        self.levels: List[_Level] = []
+
+    def replay_file(self, file_path: str):
+        stream = scan_file(file_path)
+
+        if len(self.levels) == 0:
+            self.levels.append(_Level(stream.content.get_location()))
+
+        index = 0
+
+        while index < len(stream):
+            index = self.replay_event(stream, index)
+
+    def replay_event(self, stream: EventStream, index: int) -> int:
+        kind = stream.kinds[index]
+        tag = stream.tags[index]
+
+        if kind == BEGIN and tag == SECTION:
+            self.begin_section(stream, index)
+
+            # The heading was read with the section
+            return index + 2
+        elif kind == BEGIN and tag == CONTAINER:
+            return self.replay_container(stream, index)
+        elif kind == END and tag == CONTAINER:
+            self.end_container()
+        elif tag == BLOCK or tag == LITERAL:
+            self.add_record(stream, index)
+        elif tag == DIRECTIVE:
+            self.replay_directive(stream, index)
+
+        # Sections are closed by the next heading, even in another file
+        return index + 1
+
+    def begin_section(self, stream: EventStream, index: int):
+        level = stream.levels[index]
+
+        while (self.levels[-1].section is not None
+               and self.levels[-1].section.level >= level):
+            self.close_level()
+
+        # The attributes and captions of the section are read too
+        head = build_range(
+            stream, stream.starts[index], stream.ends[index + 1],
+            self.document)
+        section = next(head.walk(Section, include_self=True))
+
+        self.levels[-1].components.append(head)
+        self.levels.append(_Level(section.location, section))
+
+    def replay_container(self, stream: EventStream, index: int) -> int:
+        end_index = stream.find_end(index)
+
+        # Functions and containers with attributes or captions are parsed
+        if stream.levels[index] > 0 or stream.targets[index] == 1:
+            self.add_record(stream, index)
+
+            return end_index + 1
+
+        self.levels.append(_Level(stream.get_location(index)))
+
+        return index + 1
+
+    def end_container(self):
+        while self.levels[-1].section is not None:
+            self.close_level()
+
+        component = self.levels.pop().compose()
+
+        self.levels[-1].components.append(component)
+
+    def add_record(self, stream: EventStream, index: int):
+        if stream.tags[index] == CONTAINER or stream.targets[index] == 1:
+            component = build_component(stream, index, self.document)
+        else:
+            # Only the position of the component matters for the numbers
+            component = Composite(stream.get_location(index), [])
+
+        self.levels[-1].components.append(component)
+
+    def replay_directive(self, stream: EventStream, index: int):
+        content = stream.content.view(
+            stream.starts[index] + 1, stream.ends[index])
+        location = stream.get_location(index)
+        entry = parse_entry(content)
+
+        if entry.name != 'include':
+            apply_directive(
+                self.ctx, location, content.file_path,
+                entry.name, entry.value)
+            return
+
+        include_path = entry.value.to_str()
+        file_paths = resolve_include_files(include_path, content.file_path)
+
+        add_include_dependencies(
+            self.document, content.file_path, include_path, file_paths)
+
+        for file_path in file_paths:
+            self.replay_file(file_path)
+
+    def close_level(self):
+        level = self.levels.pop()
+
+        level.section.content = level.compose()
+
+    def close(self) -> Component:
+        while len(self.levels) > 1:
+            if self.levels[-1].section is not None:
+                self.close_level()
+            else:
+                self.end_container()
+
+        return self.levels[0].compose()
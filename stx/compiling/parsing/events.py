@@ -0,0 +1,455 @@
+from array import array
+from typing import List, Optional
+
+from stx.compiling.marks import attribute_special_mark, escape_char
+from stx.compiling.marks import cell_block_mark, header_row_block_mark
+from stx.compiling.marks import container_area_begin_mark
+from stx.compiling.marks import container_area_end_mark
+from stx.compiling.marks import directive_special_mark, literal_area_mark
+from stx.compiling.marks import normal_row_block_mark
+from stx.compiling.marks import not_inline_mark_matcher
+from stx.compiling.marks import ordered_item_block_mark
+from stx.compiling.marks import post_caption_block_mark
+from stx.compiling.marks import pre_caption_block_mark, section_levels
+from stx.compiling.marks import unordered_item_block_mark
+from stx.compiling.parsing.parser import CTX, capture_component
+from stx.compiling.reading.content import Content
+from stx.compiling.reading.line_index import LF_CHAR
+from stx.compiling.reading.location import PackedLocation
+from stx.compiling.reading.reader import Reader
+from stx.components import Component
+from stx.data_notation.parsing import WHITESPACE_CHARS
+from stx.document import Document
+from stx.utils.thread_context import context
+
+# Kinds of events
+BEGIN = 1
+END = 2
+TEXT = 3
+
+# Marks that continue the last list or table
+LIST_GROUP = 'list'
+TABLE_GROUP = 'table'
+
+_merging_groups = {
+    unordered_item_block_mark: LIST_GROUP,
+    ordered_item_block_mark: LIST_GROUP,
+    header_row_block_mark: TABLE_GROUP,
+    normal_row_block_mark: TABLE_GROUP,
+    cell_block_mark: TABLE_GROUP,
+}
+
+# Marks of the lines that can hold a reference target
+_target_marks = {
+    *section_levels,
+    header_row_block_mark,
+    normal_row_block_mark,
+    cell_block_mark,
+    pre_caption_block_mark,
+    post_caption_block_mark,
+    attribute_special_mark,
+}
+
+# Tags of events
+SECTION = 1
+HEADING = 2
+BLOCK = 3
+LITERAL = 4
+CONTAINER = 5
+ATTRIBUTE = 6
+DIRECTIVE = 7
+
+
+class EventStream:
+
+    def __init__(self, content: Content):
+        self.content = content
+
+        # One item per event, the range is an offset in the content
+        self.kinds = array('B')
+        self.tags = array('B')
+        self.levels = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        # 1 when the own lines of the event have attributes, captions,
+        #   headings or rows, so it can hold a reference target.
+        self.targets = array('B')
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def add(
+            self,
+            kind: int,
+            tag: int,
+            start: int,
+            end: int,
+            level: int = 0) -> int:
+        self.kinds.append(kind)
+        self.tags.append(tag)
+        self.levels.append(level)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.targets.append(0)
+
+        return len(self.kinds) - 1
+
+    def get_text(self, index: int) -> str:
+        return self.content.text[self.starts[index]:self.ends[index]]
+
+    def get_location(self, index: int) -> PackedLocation:
+        return self.content.get_location_at(self.starts[index])
+
+    def find_end(self, index: int) -> int:
+        depth = 0
+
+        while True:
+            if self.kinds[index] == BEGIN:
+                depth += 1
+            elif self.kinds[index] == END:
+                depth -= 1
+
+                if depth == 0:
+                    return index
+
+            index += 1
+
+
+def scan_file(file_path: str) -> EventStream:
+    return scan_events(Content.from_file(file_path))
+
+
+def scan_events(content: Content) -> EventStream:
+    scanner = _Scanner(content)
+
+    scanner.scan()
+
+    return scanner.stream
+
+
+def build_component(
+        stream: EventStream,
+        index: int,
+        document: Optional[Document] = None) -> Component:
+    return build_range(
+        stream, stream.starts[index], stream.ends[index], document)
+
+
+def build_range(
+        stream: EventStream,
+        start: int,
+        end: int,
+        document: Optional[Document] = None) -> Component:
+    content = stream.content.view(start, end)
+    reader = Reader()
+
+    reader.push_content(content)
+
+    if document is None:
+        document = Document(content.file_path)
+
+    ctx = CTX(document, reader)
+
+    context.push_reader(reader)
+
+    try:
+        # Headings start after the mark, the rest at the beginning of a line
+        return capture_component(ctx, content.column)
+    finally:
+        context.pop_reader()
+
+
+class _Scanner:
+
+    def __init__(self, content: Content):
+        self.stream = EventStream(content)
+        self.text = content.text
+        self.length = len(self.text)
+        self.position = 0
+        self.sections: List[int] = []
+        self.containers: List[int] = []
+        self.floors: List[int] = []
+        # Last component of the current level, the next lines can continue it
+        self.last: Optional[int] = None
+        self.group: Optional[str] = None
+        self.nested = False
+        self.blank = False
+        # Attributes and directives can continue in indented lines
+        self.special: Optional[int] = None
+        # Attributes and pre-captions are read again with their component
+        self.prefix_start: Optional[int] = None
+
+    def scan(self):
+        while self.position < self.length:
+            start = self.position
+            line_end = self.get_line_end(start)
+
+            self.position = line_end
+
+            if self.is_blank(start, line_end):
+                self.blank = True
+                self.special = None
+                continue
+            elif self.text[start] == ' ':
+                self.scan_indented(start, line_end)
+            else:
+                mark = not_inline_mark_matcher.match(self.text, start)
+
+                if mark is None:
+                    self.scan_text(start, line_end)
+                elif mark in section_levels:
+                    self.scan_section(start, section_levels[mark], len(mark))
+                elif mark == literal_area_mark:
+                    self.scan_literal(start, line_end)
+                elif mark == container_area_begin_mark:
+                    self.begin_container(start, line_end, len(mark))
+                elif mark == container_area_end_mark:
+                    self.end_container(start, line_end)
+                elif mark == attribute_special_mark:
+                    self.scan_special(start, line_end, ATTRIBUTE)
+                elif mark == directive_special_mark:
+                    self.scan_special(start, line_end, DIRECTIVE)
+                else:
+                    self.scan_block(start, line_end, mark)
+
+            self.blank = False
+
+        self.close_sections(0, self.length)
+
+        while len(self.containers) > 0:
+            self.close_container(self.length)
+
+    def get_line_end(self, start: int) -> int:
+        index = self.text.find(LF_CHAR, start)
+
+        if index == -1:
+            return self.length
+
+        return index + 1
+
+    def is_blank(self, start: int, end: int) -> bool:
+        return len(self.text[start:end].strip()) == 0
+
+    def take_start(self, start: int) -> int:
+        if self.prefix_start is not None:
+            start = self.prefix_start
+
+            self.prefix_start = None
+
+        return start
+
+    def reset_level(self):
+        self.last = None
+        self.group = None
+        self.nested = False
+        self.special = None
+
+    def skip_spaces(self, position: int) -> int:
+        while position < self.length and self.text[position] == ' ':
+            position += 1
+
+        return position
+
+    def add_component(
+            self, tag: int, start: int, end: int, target=False) -> int:
+        # Attributes and pre-captions are targets or apply to one
+        target = target or self.prefix_start is not None
+
+        self.last = self.stream.add(TEXT, tag, self.take_start(start), end)
+        self.group = None
+        self.nested = False
+        self.special = None
+
+        if target:
+            self.stream.targets[self.last] = 1
+
+        return self.last
+
+    def extend_last(self, end: int, target=False):
+        self.stream.ends[self.last] = end
+
+        if target:
+            self.stream.targets[self.last] = 1
+
+    def scan_indented(self, start: int, line_end: int):
+        mark_start = self.skip_spaces(start)
+        mark = not_inline_mark_matcher.match(self.text, mark_start)
+
+        if self.special is not None:
+            self.stream.ends[self.special] = line_end
+        elif self.nested and self.exits_section(mark):
+            # The heading closes the items and the sections around it
+            self.scan_section(mark_start, section_levels[mark], len(mark))
+        elif (self.last is not None
+                and self.stream.kinds[self.last] == TEXT
+                and (self.nested or not self.blank)):
+            # The content of items, cells and captions is indented
+            self.extend_last(line_end, mark in _target_marks)
+        else:
+            self.add_component(
+                BLOCK, start, line_end, mark in _target_marks)
+
+    def exits_section(self, mark: Optional[str]) -> bool:
+        floor = self.floors[-1] if len(self.floors) > 0 else 0
+
+        return (mark in section_levels
+                and len(self.sections) > floor
+                and self.stream.levels[self.sections[-1]]
+                >= section_levels[mark])
+
+    def scan_text(self, start: int, line_end: int):
+        if (self.last is not None
+                and self.stream.tags[self.last] == BLOCK
+                and self.prefix_start is None
+                and not self.blank):
+            self.extend_last(line_end)
+
+            # The text is a new paragraph after the last item or row
+            self.group = None
+            self.nested = False
+        else:
+            self.add_component(BLOCK, start, line_end)
+
+    def scan_block(self, start: int, line_end: int, mark: str):
+        group = _merging_groups.get(mark)
+        target = mark in _target_marks
+
+        if mark == pre_caption_block_mark:
+            # The caption is part of the next component
+            if self.prefix_start is None:
+                self.prefix_start = start
+
+            self.reset_level()
+        elif mark == post_caption_block_mark and self.last is not None:
+            self.extend_last(line_end, target)
+
+            if self.group != TABLE_GROUP:
+                self.group = None
+        elif (group is not None
+                and self.group == group
+                and self.prefix_start is None):
+            # Items and rows are added to the last list or table
+            self.extend_last(line_end, target)
+        else:
+            self.add_component(BLOCK, start, line_end, target)
+
+            self.group = group
+
+        self.nested = True
+        self.special = None
+
+    def scan_special(self, start: int, line_end: int, tag: int):
+        if tag == ATTRIBUTE:
+            if self.prefix_start is None:
+                self.prefix_start = start
+        else:
+            self.prefix_start = None
+
+        self.special = self.stream.add(TEXT, tag, start, line_end)
+
+    def scan_section(self, line_start: int, level: int, mark_length: int):
+        start = self.take_start(line_start)
+        floor = self.floors[-1] if len(self.floors) > 0 else 0
+
+        while (len(self.sections) > floor
+               and self.stream.levels[self.sections[-1]] >= level):
+            self.close_section(start)
+
+        self.sections.append(self.stream.add(BEGIN, SECTION, start, 0, level))
+
+        heading_start = self.skip_void(line_start + mark_length)
+        heading_end = self.scan_heading(heading_start)
+
+        self.stream.add(TEXT, HEADING, heading_start, heading_end, level)
+
+        self.position = heading_end
+        self.reset_level()
+
+    def skip_void(self, position: int) -> int:
+        while (position < self.length
+               and self.text[position] in WHITESPACE_CHARS):
+            position += 1
+
+        return position
+
+    def scan_heading(self, heading_start: int) -> int:
+        line_start = self.text.rfind(LF_CHAR, 0, heading_start) + 1
+        column = heading_start - line_start
+        heading_end = self.get_line_end(heading_start)
+        position = heading_end
+
+        # Following lines with the indentation of the heading continue it
+        while column > 0 and position < self.length:
+            line_end = self.get_line_end(position)
+
+            if self.is_blank(position, line_end):
+                position = line_end
+            elif self.text.startswith(' ' * column, position):
+                heading_end = line_end
+                position = line_end
+            else:
+                break
+
+        return heading_end
+
+    def close_section(self, end: int):
+        index = self.sections.pop()
+        level = self.stream.levels[index]
+
+        self.stream.ends[index] = end
+        self.stream.add(END, SECTION, end, end, level)
+
+    def close_sections(self, floor: int, end: int):
+        while len(self.sections) > floor:
+            self.close_section(end)
+
+    def scan_literal(self, start: int, line_end: int):
+        position = line_end
+        end = self.length
+
+        while position < self.length:
+            line_end = self.get_line_end(position)
+            line = self.text[position:line_end]
+
+            position = line_end
+
+            if (not line.startswith(escape_char)
+                    and line.rstrip() == literal_area_mark):
+                end = line_end
+                break
+
+        self.add_component(LITERAL, start, end)
+
+        self.position = end
+
+    def begin_container(self, start: int, line_end: int, mark_length: int):
+        # Sections in the argument of a function are not part of the outline
+        has_function = not self.is_blank(start + mark_length, line_end)
+        prefixed = self.prefix_start is not None
+        index = self.stream.add(
+            BEGIN, CONTAINER, self.take_start(start), 0, int(has_function))
+
+        if prefixed:
+            self.stream.targets[index] = 1
+
+        self.containers.append(index)
+        self.floors.append(len(self.sections))
+        self.reset_level()
+
+    def end_container(self, start: int, line_end: int):
+        if len(self.containers) == 0:
+            self.scan_block(start, line_end, container_area_end_mark)
+            return
+
+        self.close_sections(self.floors[-1], start)
+        self.close_container(line_end)
+
+    def close_container(self, end: int):
+        index = self.containers.pop()
+
+        self.floors.pop()
+        self.stream.ends[index] = end
+        self.stream.add(END, CONTAINER, end, end, self.stream.levels[index])
+
+        self.reset_level()
+        self.last = index
@@ -1,8 +1,12 @@
+import sys
+from concurrent.futures import Executor
+from contextlib import redirect_stderr, redirect_stdout
 from io import StringIO
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
 
+from stx import logger
 from stx.compiling.composer import Composer
-from stx.compiling.marks import all_marks, escape_char, literal_area_mark
+from stx.compiling.marks import all_mark_matcher, escape_char
 from stx.compiling.marks import attribute_special_mark, directive_special_mark
 from stx.compiling.marks import code_begin_mark, code_end_mark
 from stx.compiling.marks import container_area_begin_mark
@@ -13,9 +17,11 @@ from stx.compiling.marks import deleted_begin_mark, deleted_end_mark
 from stx.compiling.marks import ellipsis_single_mark
 from stx.compiling.marks import emphasized_begin_mark, emphasized_end_mark
 from stx.compiling.marks import function_begin_mark, function_end_mark
-from stx.compiling.marks import heading_block_marks, header_row_block_mark, \
-    not_inline_marks, inline_marks, link_ref_begin_mark, link_ref_end_mark
+from stx.compiling.marks import heading_block_marks, header_row_block_mark
+from stx.compiling.marks import inline_mark_matcher, not_inline_mark_matcher
+from stx.compiling.marks import link_ref_begin_mark, link_ref_end_mark
 from stx.compiling.marks import link_text_begin_mark, link_text_end_mark
+from stx.compiling.marks import literal_area_mark
 from stx.compiling.marks import normal_row_block_mark, cell_block_mark
 from stx.compiling.marks import ordered_item_block_mark, section_levels
 from stx.compiling.marks import post_caption_block_mark
@@ -23,8 +29,11 @@ from stx.compiling.marks import pre_caption_block_mark
 from stx.compiling.marks import s_quote_begin_mark, s_quote_end_mark
 from stx.compiling.marks import strong_begin_mark, strong_end_mark
 from stx.compiling.marks import unordered_item_block_mark
-from stx.compiling.reading.content import Content
-from stx.compiling.reading.location import Location
+from stx.compiling.parsing.units import Unit, UnitCache, BlockHead
+from stx.compiling.parsing.units import DirectiveCall, IncludeCall
+from stx.compiling.reading.content import Content, compile_char_set
+from stx.compiling.reading.location import PackedLocation, get_location_file
+from stx.compiling.reading.location import get_location_position
 from stx.compiling.reading.reader import Reader
 from stx.components import Component, Section, Composite, Table, TableRow, \
     Paragraph, DisplayMode
@@ -37,22 +46,64 @@ from stx.grammars import registry
 from stx.outputs import make_output_action
 from stx.utils.closeable import Closeable
 from stx.utils.debug import see
+from stx.utils.dependencies import GRAMMAR, INCLUDE
 from stx.utils.files import resolve_include_files, resolve_sibling
 from stx.utils.stx_error import StxError
+from stx.utils.thread_context import context
 
 PASS = 0
 EXIT = 1
 CONSUMED = 2
 
+# Marks that continue the last component of the previous file
+MERGING_MARKS = [
+    unordered_item_block_mark,
+    ordered_item_block_mark,
+    header_row_block_mark,
+    normal_row_block_mark,
+    cell_block_mark,
+    post_caption_block_mark,
+]
+
+_text_break_patterns: Dict[Optional[str], Pattern] = {}
+
+
+def get_text_break_pattern(stop_mark: Optional[str]) -> Pattern:
+    pattern = _text_break_patterns.get(stop_mark)
+
+    if pattern is None:
+        # Any char that could break a plain text run
+        chars = inline_mark_matcher.first_chars + escape_char + '\n'
+
+        if stop_mark is not None:
+            chars += stop_mark[0]
+
+        pattern = compile_char_set(chars)
+
+        _text_break_patterns[stop_mark] = pattern
+
+    return pattern
+
 
 class CTX:
 
-    def __init__(self, document: Document, reader: Reader):
+    def __init__(
+            self,
+            document: Document,
+            reader: Reader,
+            cache: Optional[UnitCache] = None,
+            unit: Optional[Unit] = None,
+            executor: Optional[Executor] = None):
         self.reader = reader
         self.document = document
+        self.cache = cache
+        self.unit = unit
+        self.executor = executor
         self.composer = Composer()
         self.stop_mark_stack = []
         self.section_stack: List[Section] = []
+        self.unclosed_containers = 0
+        self.included_location: Optional[PackedLocation] = None
 
     def get_parent_section(self) -> Optional[Section]:
         if len(self.section_stack) > 0:
@@ -100,10 +151,27 @@ def capture_component(
         ctx: CTX,
         indentation: int,
         breakable=True) -> Component:
-    location = ctx.reader.get_location()
-
     ctx.composer.push()
 
+    location = capture_blocks(ctx, indentation)
+
+    return compose_component(location, ctx.composer.pop())
+
+
+def compose_component(
+        location: PackedLocation, components: List[Component]) -> Component:
+    if len(components) == 0:
+        # TODO Blank component
+        return Composite(location, [])
+    elif len(components) == 1:
+        return components[0]
+
+    return Composite(location, components)
+
+
+def capture_blocks(ctx: CTX, indentation: int) -> Optional[PackedLocation]:
+    location = ctx.reader.get_location()
+
     while ctx.reader.active():
         content = ctx.reader.get_content()
 
@@ -119,7 +187,7 @@ def capture_component(
 
         location = content.get_location()
 
-        mark = content.read_mark(not_inline_marks)
+        mark = content.read_mark(not_inline_mark_matcher)
 
         signal = (
                 parse_section(ctx, mark, location, content, indentation)
@@ -148,21 +216,18 @@ def capture_component(
         else:
             raise AssertionError(f'Illegal signal: {signal}')
 
-    components = ctx.composer.pop()
+        if ctx.included_location is not None:
+            # The last block was read from an included file
+            location = ctx.included_location
+            ctx.included_location = None
 
-    if len(components) == 0:
-        # TODO Blank component
-        return Composite(location, [])
-    elif len(components) == 1:
-        return components[0]
-
-    return Composite(location, components)
+    return location
 
 
 def parse_section(
         ctx: CTX,
         mark: str,
-        location: Location,
+        location: PackedLocation,
         content: Content,
         before_mark_indentation: int) -> int:
     if mark not in heading_block_marks:
@@ -173,7 +238,7 @@ def parse_section(
 
     if (parent_section is not None
             and parent_section.level >= section_level):
-        content.go_back(location)
+        content.go_back(get_location_position(location))
         return EXIT
 
     # TODO is this ok?
@@ -188,17 +253,46 @@ def parse_section(
     ctx.section_stack.append(section)
 
     section.heading = capture_component(ctx, after_mark_indentation, True)
-    section.content = capture_component(ctx, before_mark_indentation, True)
+
+    ctx.composer.push()
+
+    content_location = capture_blocks(ctx, before_mark_indentation)
+
+    components = ctx.composer.pop()
+
+    section.content = compose_component(content_location, components)
+
+    if (ctx.unit is not None
+            and before_mark_indentation == 0
+            and not ctx.reader.active()):
+        # The section could continue in the following file
+        ctx.unit.open_level = min_level(ctx.unit.open_level, section.level)
+
+        if len(components) != 1:
+            # The location is taken from the heading that closes it
+            ctx.unit.open_composites.append(section.content)
 
     ctx.section_stack.pop()
 
     return CONSUMED
 
 
+def get_last_component(ctx: CTX) -> Optional[Component]:
+    component = ctx.composer.get_last_component()
+
+    if (component is None
+            and ctx.unit is not None
+            and len(ctx.composer.stack) == 1):
+        # Included alone, the previous component could be in another file
+        ctx.unit.complete = False
+
+    return component
+
+
 def parse_list(
         ctx: CTX,
         mark: str,
-        location: Location,
+        location: PackedLocation,
         content: Content) -> int:
     if mark == ordered_item_block_mark:
         ordered = True
@@ -207,7 +301,7 @@ def parse_list(
     else:
         return PASS
 
-    list_block = ctx.composer.get_last_component()
+    list_block = get_last_component(ctx)
 
     if not isinstance(list_block, ListBlock):
         list_block = ListBlock(location, ordered)
@@ -229,7 +323,7 @@ def parse_list(
 def parse_table(
         ctx: CTX,
         mark: str,
-        location: Location,
+        location: PackedLocation,
         content: Content) -> int:
     if mark == header_row_block_mark:
         header = True
@@ -243,7 +337,7 @@ def parse_table(
     else:
         return PASS
 
-    table = ctx.composer.get_last_component()
+    table = get_last_component(ctx)
 
     if not isinstance(table, Table):
         table = Table(location)
@@ -274,12 +368,12 @@ def parse_table(
 
         content = ctx.reader.get_content()
 
-        loc0 = content.get_location()
+        pos0 = content.position
 
         # Consume indentation when it is the beginning of the line
         if content.column == 0:
             if content.read_spaces(indentation0) < indentation0:
-                content.go_back(loc0)
+                content.go_back(pos0)
                 break
 
         if content.peek() == cell_block_mark:
@@ -315,7 +409,7 @@ def parse_caption(ctx: CTX, mark: str, content: Content) -> int:
 
 
 def parse_literal(
-        ctx: CTX, mark: str, location: Location, content: Content,
+        ctx: CTX, mark: str, location: PackedLocation, content: Content,
         indentation_before_mark: int) -> int:
     if mark != literal_area_mark:
         return PASS
@@ -365,7 +459,7 @@ def parse_literal(
 
 
 def parse_container(
-        ctx: CTX, mark: str, location: Location, content: Content,
+        ctx: CTX, mark: str, location: PackedLocation, content: Content,
         indentation_before_mark: int) -> int:
     if mark != container_area_begin_mark:
         return PASS
@@ -379,7 +473,10 @@ def parse_container(
     with ctx.using_stop_mark(container_area_end_mark):
         component = capture_component(ctx, indentation_before_mark)
 
-    content.pull(container_area_end_mark)
+    if not content.pull(container_area_end_mark):
+        # It could be closed by the content of a following file
+        ctx.unclosed_containers += 1
+
     content.expect_end_of_line()
 
     if function is not None:
@@ -409,7 +506,7 @@ def parse_attribute(ctx: CTX, mark: str, content: Content) -> int:
     return CONSUMED
 
 
-def parse_directive(ctx: CTX, mark: str, location: Location) -> int:
+def parse_directive(ctx: CTX, mark: str, location: PackedLocation) -> int:
     if mark != directive_special_mark:
         return PASS
 
@@ -418,12 +515,24 @@ def parse_directive(ctx: CTX, mark: str, location: Location) -> int:
 
     entry = parse_entry(content)
 
-    key = entry.name
-    value = entry.value
-
     if content.column > 0:
         content.expect_end_of_line()
 
+    apply_directive(ctx, location, file_path, entry.name, entry.value)
+
+    return CONSUMED
+
+
+def apply_directive(
+        ctx: CTX,
+        location: PackedLocation,
+        file_path: str,
+        key: str,
+        value: Value):
+    if ctx.unit is not None and key != 'include':
+        ctx.unit.directives.append(
+            DirectiveCall(location, file_path, key, value))
+
     if key == 'title':
         ctx.document.title = value.to_str()
     elif key == 'author':
@@ -443,26 +552,390 @@ def parse_directive(ctx: CTX, mark: str, location: Location) -> int:
     else:
         raise StxError(f'Unsupported directive: {key}')
 
-    return CONSUMED
-
 
 def process_import(
         ctx: CTX,
-        location: Location,
+        location: PackedLocation,
         file_path: str,
         include_path: Value):
     file_paths = resolve_include_files(include_path.to_str(), file_path)
 
-    ctx.reader.push_files(file_paths)
+    add_include_dependencies(
+        ctx.document, file_path, include_path.to_str(), file_paths)
+
+    if ctx.unit is not None:
+        ctx.unit.includes.append(
+            IncludeCall(include_path.to_str(), file_path, file_paths))
+        ctx.unit.dependencies.extend(file_paths)
+
+    if not include_units(ctx, file_paths):
+        ctx.reader.push_files(file_paths)
+
+
+def add_include_dependencies(
+        document: Document,
+        source_path: str,
+        include_path: str,
+        file_paths: List[str]):
+    target_path = resolve_sibling(source_path, include_path)
+
+    if file_paths != [target_path]:
+        # Files of an included directory
+        document.dependencies.add(source_path, target_path, INCLUDE)
+        source_path = target_path
+
+    for file_path in file_paths:
+        document.dependencies.add(source_path, file_path, INCLUDE)
+
+
+def include_units(ctx: CTX, file_paths: List[str]) -> bool:
+    # Included files can be parsed on their own only at the root level,
+    #   otherwise they could continue the components around the include.
+    if (ctx.cache is None
+            or ctx.reader.get_chain_count() != 1
+            or ctx.reader.has_pending_files()
+            or len(ctx.section_stack) > 0
+            or len(ctx.composer.stack) != 1
+            or ctx.stop_mark is not None
+            or not ctx.composer.attributes_buffer.empty()
+            or len(ctx.composer.pre_captions) > 0):
+        return False
+
+    runs = split_runs(ctx, file_paths)
+
+    if runs is None:
+        return False
+
+    runs, pushed = parse_runs(ctx, runs)
+
+    if len(pushed) > 0:
+        tail = pushed[0].head
+    elif ctx.reader.active():
+        tail = peek_block_head(ctx.reader.get_content())
+    else:
+        tail = BlockHead(empty=True)
+
+    open_level = get_open_level(runs)
+
+    while len(runs) > 0 and not can_splice(open_level, tail):
+        # The rest of the document continues the last run of files,
+        #   which starts on its own, so it is read again as usual.
+        pushed.insert(0, runs.pop())
+        tail = pushed[0].head
+        open_level = get_open_level(runs)
+
+    if len(runs) == 0:
+        return False
+
+    units = [run.unit for run in runs]
+
+    # The sections left open by a file are closed by the next heading
+    open_composites: List[Composite] = []
+
+    for unit in units:
+        if not unit.head.empty:
+            close_composites(open_composites, unit.head)
+            open_composites = []
+
+        open_composites.extend(unit.open_composites)
+
+    if not tail.empty:
+        close_composites(open_composites, tail)
+    elif ctx.unit is not None:
+        ctx.unit.open_level = min_level(ctx.unit.open_level, open_level)
+        ctx.unit.open_composites.extend(open_composites)
+
+    for unit in units:
+        for call in unit.directives:
+            apply_directive(
+                ctx, call.location, call.file_path, call.key, call.value)
+
+        for component in unit.components:
+            ctx.composer.add(component)
+
+        if unit.location is not None:
+            ctx.included_location = unit.location
+
+        for include in unit.includes:
+            add_include_dependencies(
+                ctx.document,
+                include.source_path,
+                include.include_path,
+                include.file_paths)
+
+        if ctx.unit is not None:
+            ctx.unit.includes.extend(unit.includes)
+            ctx.unit.dependencies.extend(unit.dependencies)
+            ctx.unit.signatures.update(unit.signatures)
+
+    if len(pushed) > 0:
+        ctx.reader.push_files(
+            [file_path for run in pushed for file_path in run.file_paths])
+
+    return True
+
+
+class UnitRun:
+
+    def __init__(self, file_path: str, unit: Unit):
+        self.file_paths = [file_path]
+        self.head = unit.head
+        # Unknown until the files of the run are parsed together
+        self.unit: Optional[Unit] = unit
 
 
-def process_output(ctx: CTX, location: Location, value: Value):
+def split_runs(ctx: CTX, file_paths: List[str]) -> Optional[List[UnitRun]]:
+    # Each run starts with a file that does not depend on the previous
+    #   ones and has the files that continue it.
+    runs: List[UnitRun] = []
+    open_level: Optional[int] = None
+    units = iter_units(ctx, file_paths)
+
+    try:
+        for index, unit in enumerate(units):
+            file_path = file_paths[index]
+
+            if can_splice(open_level, unit.head):
+                runs.append(UnitRun(file_path, unit))
+
+                if not unit.complete:
+                    # It could leave something open for the next files,
+                    #   so all of them are read as usual.
+                    runs[-1].file_paths.extend(file_paths[index + 1:])
+                    break
+                elif not unit.head.empty:
+                    open_level = unit.open_level
+                continue
+
+            # Empty files do not separate a file from the previous one
+            dependent = [file_path]
+
+            while len(runs) > 0 and runs[-1].head.empty:
+                dependent[0:0] = runs.pop().file_paths
+
+            if len(runs) == 0:
+                # It continues the content around the include
+                return None
+
+            runs[-1].file_paths.extend(dependent)
+            runs[-1].unit = None
+
+            # Not known until the run is parsed, so only a heading
+            #   of the first level can start the next run.
+            open_level = 1
+    finally:
+        units.close()
+
+    return runs
+
+
+def parse_runs(
+        ctx: CTX,
+        runs: List[UnitRun]) -> Tuple[List[UnitRun], List[UnitRun]]:
+    for index, run in enumerate(runs):
+        if run.unit is None:
+            run.unit = try_parse_unit(ctx, run.file_paths)
+
+        if not run.unit.complete:
+            return runs[:index], runs[index:]
+
+    return runs, []
+
+
+def get_open_level(runs: List[UnitRun]) -> Optional[int]:
+    open_level: Optional[int] = None
+
+    for run in runs:
+        if not run.unit.head.empty:
+            open_level = run.unit.open_level
+
+    return open_level
+
+
+def iter_units(ctx: CTX, file_paths: List[str]) -> Iterator[Unit]:
+    if ctx.executor is None:
+        for file_path in file_paths:
+            yield load_unit(ctx, file_path)
+        return
+
+    cached_units = {}
+    futures = {}
+
+    for file_path in file_paths:
+        unit = ctx.cache.load(file_path)
+
+        if unit is not None:
+            cached_units[file_path] = unit
+        else:
+            futures[file_path] = ctx.executor.submit(
+                parse_unit_alone, file_path, ctx.document.source_file)
+
+    try:
+        # Results are collected in order so the log matches a sequential run
+        for file_path in file_paths:
+            unit = cached_units.get(file_path)
+
+            if unit is not None:
+                logger.info(f'Reusing file {see(file_path, None)}...')
+            else:
+                try:
+                    unit, output, errors = futures[file_path].result()
+                except Exception:
+                    unit = Unit(file_path)
+                    unit.complete = False
+                else:
+                    sys.stdout.write(output)
+                    sys.stderr.write(errors)
+
+                ctx.cache.save(unit)
+
+            yield unit
+    finally:
+        # The files after a fallback are read as usual
+        for future in futures.values():
+            future.cancel()
+
+
+def load_unit(ctx: CTX, file_path: str) -> Unit:
+    unit = ctx.cache.load(file_path)
+
+    if unit is not None:
+        logger.info(f'Reusing file {see(file_path, None)}...')
+        return unit
+
+    unit = try_parse_unit(ctx, [file_path])
+
+    ctx.cache.save(unit)
+
+    return unit
+
+
+def parse_unit_alone(
+        file_path: str, source_file: str) -> Tuple[Unit, str, str]:
+    ctx = CTX(Document(source_file), Reader(), UnitCache())
+    output = StringIO()
+    errors = StringIO()
+
+    with redirect_stdout(output), redirect_stderr(errors):
+        unit = try_parse_unit(ctx, [file_path])
+
+    return unit, output.getvalue(), errors.getvalue()
+
+
+def try_parse_unit(ctx: CTX, file_paths: List[str]) -> Unit:
+    try:
+        return parse_unit(ctx, file_paths)
+    except Exception:
+        # It may depend on the previous file, the error
+        #   is reported when it is included as usual.
+        unit = Unit(file_paths[0])
+        unit.complete = False
+        return unit
+
+
+def parse_unit(ctx: CTX, file_paths: List[str]) -> Unit:
+    # Files that continue each other are parsed together as a single unit
+    unit = Unit(file_paths[0])
+    unit.dependencies = list(file_paths)
+    reader = Reader()
+    unit_ctx = CTX(Document(ctx.document.source_file), reader, ctx.cache, unit)
+
+    context.push_reader(reader)
+
+    try:
+        reader.push_files(file_paths)
+
+        if reader.active():
+            unit.head = peek_block_head(reader.get_content())
+
+        if unit.head.indented or unit.head.mark in MERGING_MARKS:
+            # It depends on the previous file, so it is not parsed alone
+            unit.complete = False
+            return unit
+
+        unit_ctx.composer.push()
+
+        location = capture_blocks(unit_ctx, 0)
+
+        if not unit.head.empty:
+            unit.location = location
+
+        unit.components = unit_ctx.composer.pop()
+
+        if reader.active():
+            raise StxError('Unexpected content.', reader.get_location())
+    finally:
+        context.pop_reader()
+
+        unit.signatures.update(reader.signatures)
+
+    unit.complete = (
+        unit.complete
+        and unit_ctx.unclosed_containers == 0
+        and unit_ctx.composer.attributes_buffer.empty()
+        and len(unit_ctx.composer.pre_captions) == 0
+    )
+
+    return unit
+
+
+def peek_block_head(content: Content) -> BlockHead:
+    position = content.position
+
+    while content.consume_empty_line():
+        pass
+
+    c = content.peek()
+
+    if c is None:
+        head = BlockHead(empty=True)
+    elif c == ' ':
+        head = BlockHead(empty=False, indented=True)
+    else:
+        head = BlockHead(
+            empty=False,
+            location=content.get_location(),
+            mark=content.test_mark(not_inline_mark_matcher))
+
+    content.go_back(position)
+
+    return head
+
+
+def close_composites(composites: List[Composite], head: BlockHead):
+    for composite in composites:
+        composite.location = head.location
+
+
+def min_level(level1: Optional[int], level2: Optional[int]) -> Optional[int]:
+    if level1 is None:
+        return level2
+    elif level2 is None:
+        return level1
+
+    return min(level1, level2)
+
+
+def can_splice(open_level: Optional[int], head: BlockHead) -> bool:
+    if head.empty:
+        return True
+    elif head.indented:
+        return False
+    elif open_level is not None:
+        # The sections are still open, only a heading can close them
+        return (head.mark in section_levels
+                and section_levels[head.mark] <= open_level)
+
+    return head.mark not in MERGING_MARKS
+
+
+def process_output(ctx: CTX, location: PackedLocation, value: Value):
     action = make_output_action(ctx.document, location, value)
 
     ctx.document.actions.append(action)
 
 
-def process_grammar(ctx: CTX, location: Location, value: Value):
+def process_grammar(ctx: CTX, location: PackedLocation, value: Value):
     d = value.to_dict()
 
     lang = d['lang']
@@ -471,6 +944,8 @@ def process_grammar(ctx: CTX, location: Location, value: Value):
 
     file = resolve_sibling(ctx.document.source_file, file)
 
+    ctx.document.dependencies.add(get_location_file(location), file, GRAMMAR)
+
     try:
         registry.register_grammar_from_file(lang, file, rule)
     except Exception as e:
@@ -480,7 +955,7 @@ def process_grammar(ctx: CTX, location: Location, value: Value):
 def parse_inline_component(
         ctx: CTX,
         mark: str,
-        location: Location,
+        location: PackedLocation,
         content: Content,
         indentation: int):
     inlines = parse_inline(ctx, location, content, indentation)
@@ -502,7 +977,7 @@ def parse_inline_component(
 
 
 def parse_inline(
-        ctx: CTX, location: Location,
+        ctx: CTX, location: PackedLocation,
         content: Content, indentation: int) -> List[Component]:
     ctx.composer.push()
 
@@ -513,7 +988,7 @@ def parse_inline(
 
             location = content.get_location()
 
-            mark = content.read_mark(inline_marks)
+            mark = content.read_mark(inline_mark_matcher)
 
             signal = (
                 parse_inline_function(ctx, mark, location, content)
@@ -545,7 +1020,8 @@ def parse_inline(
 
 
 def parse_inline_function(
-        ctx: CTX, mark: str, location: Location, content: Content) -> int:
+        ctx: CTX, mark: str, location: PackedLocation,
+        content: Content) -> int:
     if mark != function_begin_mark:
         return PASS
 
@@ -571,7 +1047,7 @@ def parse_inline_function(
 
 
 def parse_inline_container(
-        ctx: CTX, mark: str, location: Location,
+        ctx: CTX, mark: str, location: PackedLocation,
         content: Content, indentation: int) -> int:
     if mark != container_begin_mark:
         return PASS
@@ -611,7 +1087,7 @@ def parse_inline_container(
 
 
 def parse_inline_style(
-        ctx: CTX, mark: str, location: Location,
+        ctx: CTX, mark: str, location: PackedLocation,
         content: Content, indentation: int) -> int:
     if mark == strong_begin_mark:
         end_mark = strong_end_mark
@@ -651,7 +1127,7 @@ def parse_inline_style(
 
 
 def parse_inline_link(
-        ctx: CTX, mark: str, location: Location,
+        ctx: CTX, mark: str, location: PackedLocation,
         content: Content, indentation: int) -> int:
     if mark != link_text_begin_mark:
         return PASS
@@ -666,19 +1142,11 @@ def parse_inline_link(
         raise StxError(f'Expected mark: {link_text_end_mark}')
 
     if content.pull(link_ref_begin_mark):
-        out = StringIO()
-
-        while not content.pull(link_ref_end_mark):
-            c = content.peek()
-
-            if c is None:
-                raise StxError(
-                    f'Expected {link_ref_end_mark}', content.get_location())
+        reference = content.read_until([link_ref_end_mark])
 
-            out.write(c)
-            content.move_next()
-
-        reference = out.getvalue()
+        if not content.pull(link_ref_end_mark):
+            raise StxError(
+                f'Expected {link_ref_end_mark}', content.get_location())
     else:
         reference = None
 
@@ -688,7 +1156,7 @@ def parse_inline_link(
 
 
 def parse_inline_token(
-        ctx: CTX, mark: str, location: Location,
+        ctx: CTX, mark: str, location: PackedLocation,
         content: Content, indentation: int) -> int:
     if mark == ellipsis_single_mark:
         text = '\u2026'
@@ -703,7 +1171,7 @@ def parse_inline_token(
 
 
 def parse_inline_text(
-        ctx: CTX, mark: str, location: Location,
+        ctx: CTX, mark: str, location: PackedLocation,
         content: Content, indentation: int) -> int:
     if mark is not None:
         return PASS
@@ -712,9 +1180,11 @@ def parse_inline_text(
 
     completed = False
 
+    break_pattern = get_text_break_pattern(ctx.stop_mark)
+
     while content.peek() is not None:
         # Check if the text is broken by an inline or stop mark
-        if content.test_any(inline_marks):
+        if content.test_mark(inline_mark_matcher):
             break
         elif content.test(ctx.stop_mark):
             break
@@ -730,25 +1200,25 @@ def parse_inline_text(
                 completed = True
                 break
 
-            loc0 = content.get_location()
+            pos0 = content.position
 
             spaces = content.read_spaces(indentation)
 
             # Check if the text is completed by indentation change
             if spaces < indentation:
-                content.go_back(loc0)
+                content.go_back(pos0)
                 completed = True
                 break
 
             # Check if the text is completed by a non-inline mark
-            if content.test_any(not_inline_marks):
-                content.go_back(loc0)
+            if content.test_mark(not_inline_mark_matcher):
+                content.go_back(pos0)
                 completed = True
                 break
         elif c == escape_char:
             content.move_next()
 
-            escaped_mark = content.pull_any(all_marks)
+            escaped_mark = content.read_mark(all_mark_matcher)
             if escaped_mark is not None:
                 out.write(escaped_mark)
             elif content.pull(ctx.stop_mark):
@@ -761,6 +1231,9 @@ def parse_inline_text(
             out.write(c)
             content.move_next()
 
+            # Ordinary chars are copied in one run
+            out.write(content.read_until_match(break_pattern))
+
     text = out.getvalue()
 
     if text == '':
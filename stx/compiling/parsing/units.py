@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from stx import logger
+from stx.components import Component, Composite, FunctionCall
+from stx.compiling.reading.location import PackedLocation, get_file_id
+from stx.compiling.reading.location import get_file_paths, relocate_location
+from stx.data_notation.values import Value
+from stx.utils.debug import see
+from stx.utils.files import FileSignature, hash_file, resolve_include_files
+
+# Increased every time the pickled layout of the components changes
+UNIT_FORMAT = 4
+
+# Entries kept in memory, the least recently used ones are read again
+#   from the directory of the cache if there is one.
+DEFAULT_UNIT_CACHE_SIZE = 1024
+
+
+class BlockHead:
+
+    def __init__(
+            self,
+            empty: bool,
+            indented: bool = False,
+            location: Optional[PackedLocation] = None,
+            mark: Optional[str] = None):
+        self.empty = empty
+        self.indented = indented
+        self.location = location
+        self.mark = mark
+
+
+class DirectiveCall:
+
+    def __init__(
+            self,
+            location: PackedLocation,
+            file_path: str,
+            key: str,
+            value: Value):
+        self.location = location
+        self.file_path = file_path
+        self.key = key
+        self.value = value
+
+
+class IncludeCall:
+
+    def __init__(
+            self,
+            include_path: str,
+            source_path: str,
+            file_paths: List[str]):
+        self.include_path = include_path
+        self.source_path = source_path
+        self.file_paths = file_paths
+
+    def is_outdated(self) -> bool:
+        file_paths = resolve_include_files(
+            self.include_path, self.source_path)
+
+        return file_paths != self.file_paths
+
+
+class Unit:
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.head = BlockHead(empty=True)
+        self.complete = True
+        self.location: Optional[PackedLocation] = None
+        self.components: List[Component] = []
+        self.open_level: Optional[int] = None
+        self.open_composites: List[Composite] = []
+        self.directives: List[DirectiveCall] = []
+        self.includes: List[IncludeCall] = []
+        self.dependencies: List[str] = [file_path]
+        # Signatures of the files as they were parsed
+        self.signatures: Dict[str, FileSignature] = {}
+
+    def __getstate__(self):
+        # The file ids of the locations are only valid in this process
+        return {**self.__dict__, 'file_paths': get_file_paths()}
+
+    def __setstate__(self, state):
+        file_paths = state.pop('file_paths')
+        file_ids = [get_file_id(file_path) for file_path in file_paths]
+
+        self.__dict__.update(state)
+
+        if file_ids != list(range(len(file_ids))):
+            self.relocate(file_ids)
+
+    def relocate(self, file_ids: List[int]):
+        self.location = relocate_location(self.location, file_ids)
+        self.head.location = relocate_location(self.head.location, file_ids)
+
+        for call in self.directives:
+            call.location = relocate_location(call.location, file_ids)
+
+        stack: List[Component] = list(self.components)
+
+        while len(stack) > 0:
+            component = stack.pop()
+            component.location = relocate_location(
+                component.location, file_ids)
+
+            stack.extend(component.get_children())
+
+            if (isinstance(component, FunctionCall)
+                    and component.argument is not None):
+                stack.append(component.argument)
+
+
+class UnitEntry:
+
+    def __init__(self, unit: Unit):
+        self.signatures = dict(unit.signatures)
+
+        for file_path in unit.dependencies:
+            if file_path not in self.signatures:
+                # It was not read, so it did not contribute to the unit
+                self.signatures[file_path] = _sign_file(file_path)
+
+        self.includes = unit.includes
+        self.data = pickle.dumps(unit, pickle.HIGHEST_PROTOCOL)
+
+    def is_valid(self) -> bool:
+        for file_path, signature in self.signatures.items():
+            if signature is None or not signature.matches(file_path):
+                return False
+
+        for include in self.includes:
+            if include.is_outdated():
+                return False
+
+        return True
+
+
+def _sign_file(file_path: str) -> Optional[FileSignature]:
+    try:
+        return FileSignature.from_file(file_path)
+    except OSError:
+        return None
+
+
+class UnitCache:
+
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            version: Optional[str] = None,
+            max_size: int = DEFAULT_UNIT_CACHE_SIZE):
+        self.directory = directory
+        self.version = version
+        self.max_size = max_size
+        self._entries: OrderedDict[str, UnitEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, file_path: str) -> Optional[Unit]:
+        entry = self._entries.get(file_path)
+
+        if entry is None and self.directory is not None:
+            entry = self._read_entry(file_path)
+
+            if entry is not None:
+                self._put_entry(file_path, entry)
+
+        if entry is None:
+            return None
+        elif not entry.is_valid():
+            del self._entries[file_path]
+            return None
+
+        self._entries.move_to_end(file_path)
+
+        # Each load produces a fresh tree since linking mutates it
+        return pickle.loads(entry.data)
+
+    def save(self, unit: Unit):
+        entry = UnitEntry(unit)
+
+        self._put_entry(unit.file_path, entry)
+
+        # Stored under the parsed text, the file could have changed since
+        signature = unit.signatures.get(unit.file_path)
+
+        if self.directory is not None and signature is not None:
+            self._write_entry(unit.file_path, signature.digest, entry)
+
+    def _put_entry(self, file_path: str, entry: UnitEntry):
+        self._entries[file_path] = entry
+        self._entries.move_to_end(file_path)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _get_entry_path(self, file_path: str, digest: str) -> str:
+        key = hashlib.sha1()
+        key.update(str(self.version).encode('utf-8'))
+        key.update(str(UNIT_FORMAT).encode('utf-8'))
+        key.update(os.path.abspath(file_path).encode('utf-8'))
+        key.update(digest.encode('utf-8'))
+
+        return os.path.join(self.directory, key.hexdigest())
+
+    def _read_entry(self, file_path: str) -> Optional[UnitEntry]:
+        try:
+            entry_path = self._get_entry_path(file_path, hash_file(file_path))
+
+            with open(entry_path, mode='rb') as stream:
+                return pickle.load(stream)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(
+                f'Ignoring cache entry of {see(file_path, None)}: {e}')
+            return None
+
+    def _write_entry(self, file_path: str, digest: str, entry: UnitEntry):
+        entry_path = self._get_entry_path(file_path, digest)
+        temp_path = f'{entry_path}.{os.getpid()}.tmp'
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(temp_path, mode='wb') as stream:
+            pickle.dump(entry, stream, pickle.HIGHEST_PROTOCOL)
+
+        # Concurrent builds never read a partially written entry
+        os.replace(temp_path, entry_path)
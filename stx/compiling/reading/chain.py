@@ -1,15 +1,21 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from stx.compiling.reading.content import Content
+from stx.utils.files import FileSignature
 
 
 class Chain:
 
-    def __init__(self, file_paths: List[str]):
+    def __init__(
+            self,
+            file_paths: List[str],
+            content: Optional[Content] = None,
+            signatures: Optional[Dict[str, FileSignature]] = None):
         self.file_paths = file_paths
-        self._current_content: Optional[Content] = None
+        self.signatures = signatures
+        self._current_content = content
 
-        if len(file_paths) == 0:
+        if len(file_paths) == 0 and content is None:
             raise Exception('no files available')
 
     def active(self) -> bool:
@@ -22,9 +28,19 @@ class Chain:
             return None
         file_path = self.file_paths.pop(0)
         content = Content.from_file(file_path)
+
+        if self.signatures is not None:
+            self.signatures[file_path] = content.signature
+
         return content
 
     def get_current_content(self) -> Optional[Content]:
-        if self._current_content is None or self._current_content.halted():
+        # Empty files are skipped so they do not end the chain
+        while (self._current_content is None
+               or self._current_content.halted()):
             self._current_content = self.load_next_content()
+
+            if self._current_content is None:
+                break
+
         return self._current_content
@@ -1,113 +1,104 @@
 from __future__ import annotations
 
+import io
 import re
-from io import StringIO
-from typing import List, Optional
+from copy import copy
+from typing import Dict, Iterable, List, Optional, Pattern
 
 from stx import logger
-from stx.compiling.marks import get_matching_mark, mark_max_length
-from stx.compiling.reading.location import Location
+from stx.compiling.marks import MarkMatcher
+from stx.compiling.reading.line_index import LineIndex, LF_CHAR
+from stx.compiling.reading.location import PackedLocation, get_file_id
+from stx.compiling.reading.location import pack_location
+from stx.utils.files import FileSignature
 from stx.utils.stx_error import StxError
 from stx.utils.debug import see
 
-LF_CHAR = '\n'  # Line Feed
-
 EMPTY_OR_WHITESPACE = r'^ *$'
 
+SPACES_PATTERN = re.compile(r' *')
+END_OF_LINE_PATTERN = re.compile(r'[^\S\n]*(?:\n|\Z)')
+NEVER_PATTERN = re.compile(r'(?!)')
 
-class TRX:
-
-    def __init__(self, content: Content):
-        self._content = content
-        self._position = None
-        self._line = None
-        self._column = None
-        self._state = 'created'
-
-    def __enter__(self):
-        if self._state == 'started':
-            raise Exception('Transaction is already started.')
-
-        self._position = self._content.position
-        self._line = self._content.line
-        self._column = self._content.column
-        self._state = 'started'
-        self._content.transactions.append(self)
-        return self
-
-    def _pop_transaction(self):
-        if len(self._content.transactions) == 0:
-            raise Exception('Corrupted transaction')
-
-        trx = self._content.transactions.pop()
-
-        if trx != self:
-            raise Exception('Corrupted transaction')
+_char_set_patterns: Dict[str, Pattern] = {}
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if exc_val is not None:
-            raise exc_val
 
-        if self._state not in ['saved', 'canceled']:
-            raise Exception(f'Unfinished transaction: {self._state}')
+def compile_char_set(chars: Iterable[str], negated=False) -> Pattern:
+    chars = ''.join(chars)
 
-    def save(self):
-        self._pop_transaction()
+    if len(chars) == 0:
+        return NEVER_PATTERN
 
-        self._state = 'saved'
+    key = ('^' if negated else '') + chars
+    pattern = _char_set_patterns.get(key)
 
-    def cancel(self):
-        self._pop_transaction()
+    if pattern is None:
+        if negated:
+            pattern = re.compile(f'[^{re.escape(chars)}]')
+        else:
+            pattern = re.compile(f'[{re.escape(chars)}]')
 
-        self._content.position = self._position
-        self._content.line = self._line
-        self._content.column = self._column
+        _char_set_patterns[key] = pattern
 
-        self._state = 'canceled'
+    return pattern
 
 
 class Content:
 
-    def __init__(self, content: str, file_path: str):
+    def __init__(
+            self,
+            content: str,
+            file_path: str,
+            signature: Optional[FileSignature] = None):
         self.file_path = file_path
+        self.signature = signature
         self.position = 0
-        self.line = 0
-        self.column = 0
-        self.transactions: List[TRX] = []
         self._content = content
         self._length = len(content)
+        self._line_index = LineIndex(content)
+        self._location_base = pack_location(
+            get_file_id(file_path, self._line_index), 0)
 
     @staticmethod
     def from_file(file_path: str) -> Content:
         logger.info(f'Loading file {see(file_path, None)}...')
 
-        with open(file_path, mode='r') as stream:
-            content = stream.read().rstrip()
+        with open(file_path, mode='rb') as stream:
+            signature, data = FileSignature.from_stream(stream)
+
+        # Decoded as a text-mode open would do
+        content = io.TextIOWrapper(io.BytesIO(data)).read().rstrip()
+
+        return Content(content, file_path, signature)
 
-        return Content(content, file_path)
+    @property
+    def text(self) -> str:
+        return self._content
 
-    def checkout(self) -> TRX:
-        return TRX(self)
+    @property
+    def line(self) -> int:
+        return self._line_index.get_line(self.position)
 
-    def go_back(self, location: Location):
-        self.position = location.position
-        self.line = location.line
-        self.column = location.column
+    @property
+    def column(self) -> int:
+        return self._line_index.get_column(self.position)
+
+    def view(self, start: int, end: int) -> Content:
+        # Shares the text and lines, reading stops at the end of the range
+        view = copy(self)
+        view.position = start
+        view._length = end
+        return view
+
+    def go_back(self, position: int):
+        self.position = position
 
     def halted(self):
-        return self.position >= self._length and len(self.transactions) == 0
+        return self.position >= self._length
 
     def move_next(self):
         if self.position < self._length:
-            new_line = (self._content[self.position] == LF_CHAR)
-
             self.position += 1
-
-            if new_line:
-                self.line += 1
-                self.column = 0
-            else:
-                self.column += 1
         else:
             raise StxError('EOF')
 
@@ -119,7 +110,7 @@ class Content:
 
     def test_any(self, tokens: List[str]) -> bool:
         for token in tokens:
-            if self.test(token):
+            if self._content.startswith(token, self.position, self._length):
                 return True
 
         return False
@@ -128,19 +119,7 @@ class Content:
         if token is None:
             return False
 
-        loc0 = self.get_location()
-
-        for expected_char in token:
-            actual_char = self.peek()
-
-            if actual_char is None or actual_char != expected_char:
-                self.go_back(loc0)
-                return False
-
-            self.move_next()
-
-        self.go_back(loc0)
-        return True
+        return self._content.startswith(token, self.position, self._length)
 
     def pull_any(self, tokens: List[str]) -> Optional[str]:
         for token in tokens:
@@ -152,17 +131,10 @@ class Content:
         if token is None:
             return False
 
-        loc0 = self.get_location()
-
-        for expected_char in token:
-            actual_char = self.peek()
-
-            if actual_char is None or actual_char != expected_char:
-                self.go_back(loc0)
-                return False
-
-            self.move_next()
+        if not self._content.startswith(token, self.position, self._length):
+            return False
 
+        self.position += len(token)
         return True
 
     def read_next(self) -> Optional[str]:
@@ -171,141 +143,120 @@ class Content:
         if c is None:
             return None
 
-        self.move_next()
+        self.position += 1
         return c
 
     def read_until(
             self,
-            chars: List[str],
+            chars: Iterable[str],
             consume_last=False,
             max_length=None) -> str:
-        out = StringIO()
+        start = self.position
 
-        while True:
-            if max_length is not None and out.tell() >= max_length:
-                break
-
-            c = self.peek()
+        if max_length is not None:
+            end = min(start + max_length, self._length)
+        else:
+            end = self._length
 
-            if c is None:
-                break
-            elif c in chars:
-                if consume_last:
-                    out.write(c)
-                    self.move_next()
-                break
+        match = compile_char_set(chars).search(self._content, start, end)
 
-            out.write(c)
-            self.move_next()
+        if match is None:
+            stop = end
+        elif consume_last:
+            stop = match.start() + 1
+        else:
+            stop = match.start()
 
-        return out.getvalue()
+        self.position = stop
 
-    def read_while(self, chars: List[str]) -> str:
-        out = StringIO()
+        return self._content[start:stop]
 
-        while True:
-            c = self.peek()
+    def read_while(self, chars: Iterable[str]) -> str:
+        return self.read_until_match(compile_char_set(chars, negated=True))
 
-            if c is None or c not in chars:
-                break
+    def read_until_match(self, pattern: Pattern) -> str:
+        start = self.position
 
-            out.write(c)
+        match = pattern.search(self._content, start, self._length)
 
-            self.move_next()
+        if match is None:
+            self.position = self._length
+        else:
+            self.position = match.start()
 
-        return out.getvalue()
+        return self._content[start:self.position]
 
     def read_max(self, max_length: int) -> str:
-        out = StringIO()
-
-        while True:
-            c = self.peek()
+        start = self.position
 
-            if c is None:
-                break
+        # At least one char is read, even for a zero max length
+        self.position = min(start + max(max_length, 1), self._length)
 
-            out.write(c)
+        return self._content[start:self.position]
 
-            self.move_next()
-
-            if out.tell() >= max_length:
-                break
-
-        return out.getvalue()
-
-    def alive(self, indentation: int) -> bool:  # TRX
+    def alive(self, indentation: int) -> bool:
         if indentation > 0 and self.column < indentation:
-            with self.checkout() as trx:
-                line_prefix = self.read_until(['\n'], max_length=indentation)
+            position = self.position
+            line_prefix = self.read_until(['\n'], max_length=indentation)
+
+            if re.match(EMPTY_OR_WHITESPACE, line_prefix):
+                return True
 
-                if re.match(EMPTY_OR_WHITESPACE, line_prefix):
-                    trx.save()
-                    return True
-                else:
-                    trx.cancel()
-                    return False
+            self.position = position
+            return False
 
         return self.position < self._length
 
-    def read_mark(self, valid_marks: List[str]) -> Optional[str]:
-        loc0 = self.get_location()
-
-        token = self.read_until(
-            chars=[' ', '\n'],
-            consume_last=False,
-            max_length=mark_max_length)
+    def test_mark(self, matcher: MarkMatcher) -> Optional[str]:
+        if self.position >= self._length:
+            return None
 
-        mark = get_matching_mark(token, valid_marks)
+        return matcher.match(self._content, self.position, self._length)
 
-        self.go_back(loc0)
+    def read_mark(self, matcher: MarkMatcher) -> Optional[str]:
+        mark = self.test_mark(matcher)
 
         if mark is None:
             return None
 
-        for i in range(len(mark)):
-            self.move_next()
+        self.position += len(mark)
 
         return mark
 
     def read_line(self, indentation: int) -> Optional[str]:
-        loc0 = self.get_location()
+        start = self.position
 
         # Case when an empty line is immediately found
         if self.peek() == '\n':
-            self.move_next()
+            self.position += 1
             return '\n'
 
-        while self.column < indentation:
-            if self.peek() != ' ':
-                self.go_back(loc0)
-                return None
+        missing_spaces = indentation - self.column
 
-            self.move_next()
+        if missing_spaces > 0:
+            line_start = start + missing_spaces
 
-        out = StringIO()
-        length = 0
+            if self._content[start:line_start] != ' ' * missing_spaces:
+                return None
+        else:
+            line_start = start
 
-        while True:
-            c = self.peek()
+        lf_index = self._content.find(LF_CHAR, line_start, self._length)
 
-            if c is None:
-                if length == 0:
-                    # Nothing has been actually read
-                    self.go_back(loc0)
-                    return None
-                else:
-                    # Not a line feed but it's ok
-                    break
+        if lf_index == -1:
+            # Not a line feed but it's ok
+            line_end = self._length
+        else:
+            # Line feed: end of line!
+            line_end = lf_index + 1
 
-            out.write(c)
-            self.move_next()
-            length += 1
+        if line_end == line_start:
+            # Nothing has been actually read
+            return None
 
-            if c == '\n':
-                # Line feed: end of line!
-                break
+        self.position = line_end
 
-        return out.getvalue()
+        return self._content[line_start:line_end]
 
     def expect_char(self, options: List[str]):
         c = self.read_next()
@@ -316,63 +267,60 @@ class Content:
         return c
 
     def expect_end_of_line(self):
-        with self.checkout() as trx:
-            text = self.read_until(['\n'], consume_last=True)
+        match = END_OF_LINE_PATTERN.match(
+            self._content, self.position, self._length)
 
-            if len(text.strip()) > 0:
-                trx.cancel()
-                raise StxError('Expected end of line.')
+        if match is None:
+            raise StxError('Expected end of line.')
 
-            trx.save()
+        self.position = match.end()
 
-    def get_location(self) -> Location:
-        return Location(self.file_path, self.line, self.column, self.position)
+    def get_location(self) -> PackedLocation:
+        return self._location_base | self.position
 
-    def read_spaces(self, max_length: int = None) -> int:
-        count = 0
+    def get_location_at(self, position: int) -> PackedLocation:
+        return self._location_base | position
+
+    def count_spaces(self, max_length: int = None) -> int:
+        if max_length is not None:
+            # At least one space is counted, even for a zero max length
+            end = min(self.position + max(max_length, 1), self._length)
+        else:
+            end = self._length
+
+        match = SPACES_PATTERN.match(self._content, self.position, end)
 
-        while self.peek() == ' ':
-            self.move_next()
+        return match.end() - self.position
 
-            count += 1
+    def read_spaces(self, max_length: int = None) -> int:
+        count = self.count_spaces(max_length)
 
-            if max_length is not None and count >= max_length:
-                break
+        self.position += count
 
         return count
 
     def consume_indentation(self, indentation: int) -> bool:
-        loc0 = self.get_location()
-
-        while self.column < indentation:
-            if self.peek() == ' ':
-                self.move_next()
-            else:
-                break
+        missing_spaces = indentation - self.column
 
-        if self.column >= indentation:
+        if missing_spaces <= 0:
             return True
 
-        self.go_back(loc0)
-        return False
-
-    def consume_empty_line(self) -> bool:
-        loc0 = self.get_location()
-
-        count = 0
+        if self.count_spaces(missing_spaces) < missing_spaces:
+            return False
 
-        while self.peek() == ' ':
-            self.move_next()
+        self.position += missing_spaces
+        return True
 
-            count += 1
+    def consume_empty_line(self) -> bool:
+        count = self.count_spaces()
 
-        c = self.peek()
+        index = self.position + count
 
-        if c is None:
+        if index >= self._length:
+            self.position = index
             return count > 0
-        elif c == '\n':
-            self.move_next()
+        elif self._content[index] == '\n':
+            self.position = index + 1
             return True
 
-        self.go_back(loc0)
         return False
@@ -0,0 +1,23 @@
+from array import array
+from bisect import bisect_right
+
+LF_CHAR = '\n'  # Line Feed
+
+
+class LineIndex:
+
+    def __init__(self, text: str):
+        # Machine ints instead of a list of int objects
+        self.offsets = array('L', [0])
+
+        index = text.find(LF_CHAR)
+
+        while index != -1:
+            self.offsets.append(index + 1)
+            index = text.find(LF_CHAR, index + 1)
+
+    def get_line(self, position: int) -> int:
+        return bisect_right(self.offsets, position) - 1
+
+    def get_column(self, position: int) -> int:
+        return position - self.offsets[self.get_line(position)]
@@ -1,17 +1,203 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from stx.compiling.reading.line_index import LineIndex
+
+POSITION_BITS = 32
+POSITION_MASK = (1 << POSITION_BITS) - 1
+
+# File id in the high bits and position in the low bits, see pack_location
+PackedLocation = int
+
+# Line indexes kept for the diagnostics, the least recently used ones
+#   are read again from their file when they are needed.
+MAX_LINE_INDEXES = 256
+
+# Files of the locations, shared by every compile of the process.
+#   The ids must stay valid for the units kept by the caches.
+_file_paths: List[str] = []
+_file_ids: Dict[str, int] = {}
+_line_indexes: OrderedDict[int, LineIndex] = OrderedDict()
+
+# Compiles run in the server and watch threads
+_lock = threading.Lock()
+
+# Line indexes of the files read by the compiles running in each thread,
+#   see keep_line_indexes.
+_compiles = threading.local()
 
 
 class Location:
 
-    def __init__(self, file_path: str, line: int, column: int, position: int):
+    __slots__ = ('file_path', 'position', 'line_index')
+
+    def __init__(
+            self,
+            file_path: str,
+            position: int,
+            line_index: Optional[LineIndex]):
         self.file_path = file_path
-        self.line = line
-        self.column = column
         self.position = position
+        # None when the file can no longer be read
+        self.line_index = line_index
+
+    @property
+    def line(self) -> Optional[int]:
+        if self.line_index is None:
+            return None
+
+        return self.line_index.get_line(self.position)
+
+    @property
+    def column(self) -> Optional[int]:
+        if self.line_index is None:
+            return None
+
+        return self.line_index.get_column(self.position)
 
     def __str__(self):
+        if self.line_index is None:
+            return f'{self.file_path} @ Unknown line'
+
         return (f'{self.file_path} @'
                 f' Line {self.line + 1},'
                 f' Column {self.column + 1}')
 
     def decorate(self, message: str):
         return f'{message} << {self}'
+
+
+def get_file_id(
+        file_path: str, line_index: Optional[LineIndex] = None) -> int:
+    with _lock:
+        file_id = _file_ids.get(file_path)
+
+        if file_id is None:
+            file_id = len(_file_paths)
+
+            _file_paths.append(file_path)
+            _file_ids[file_path] = file_id
+
+        if line_index is not None:
+            # The file was read again, the old lines are replaced
+            _put_line_index(file_id, line_index)
+
+    if line_index is not None:
+        _keep_line_index(file_id, line_index)
+
+    return file_id
+
+
+@contextmanager
+def keep_line_indexes() -> Iterator[None]:
+    # The lines of the files read while compiling a document stay valid
+    #   until it is done, even if they are dropped or the files change.
+    tables = _get_compile_tables()
+
+    # Nested compiles share the lines with the outer one
+    tables.append(tables[-1] if len(tables) > 0 else {})
+
+    try:
+        yield
+    finally:
+        tables.pop()
+
+
+def _get_compile_tables() -> List[Dict[int, LineIndex]]:
+    tables = getattr(_compiles, 'tables', None)
+
+    if tables is None:
+        tables = []
+        _compiles.tables = tables
+
+    return tables
+
+
+def _keep_line_index(file_id: int, line_index: LineIndex):
+    tables = _get_compile_tables()
+
+    if len(tables) > 0:
+        tables[-1][file_id] = line_index
+
+
+def _find_kept_line_index(file_id: int) -> Optional[LineIndex]:
+    tables = _get_compile_tables()
+
+    if len(tables) == 0:
+        return None
+
+    return tables[-1].get(file_id)
+
+
+def get_file_paths() -> List[str]:
+    return list(_file_paths)
+
+
+def pack_location(file_id: int, position: int) -> PackedLocation:
+    return (file_id << POSITION_BITS) | position
+
+
+def get_location_file(location: PackedLocation) -> str:
+    return _file_paths[location >> POSITION_BITS]
+
+
+def get_location_position(location: PackedLocation) -> int:
+    return location & POSITION_MASK
+
+
+def relocate_location(
+        location: Optional[PackedLocation],
+        file_ids: List[int]) -> Optional[PackedLocation]:
+    if location is None:
+        return None
+
+    return pack_location(
+        file_ids[location >> POSITION_BITS], location & POSITION_MASK)
+
+
+def expand_location(location: Optional[PackedLocation]) -> Optional[Location]:
+    if location is None:
+        return None
+
+    file_id = location >> POSITION_BITS
+    file_path = _file_paths[file_id]
+    line_index = _find_kept_line_index(file_id)
+
+    if line_index is None:
+        with _lock:
+            line_index = _line_indexes.get(file_id)
+
+            if line_index is not None:
+                _line_indexes.move_to_end(file_id)
+
+    if line_index is None:
+        # Locations loaded from a cache or lines that were dropped
+        line_index = _load_line_index(file_path)
+
+        if line_index is not None:
+            with _lock:
+                _put_line_index(file_id, line_index)
+
+            _keep_line_index(file_id, line_index)
+
+    return Location(file_path, location & POSITION_MASK, line_index)
+
+
+def _put_line_index(file_id: int, line_index: LineIndex):
+    _line_indexes[file_id] = line_index
+    _line_indexes.move_to_end(file_id)
+
+    while len(_line_indexes) > MAX_LINE_INDEXES:
+        _line_indexes.popitem(last=False)
+
+
+def _load_line_index(file_path: str) -> Optional[LineIndex]:
+    try:
+        with open(file_path, mode='r') as stream:
+            return LineIndex(stream.read())
+    except OSError:
+        return None
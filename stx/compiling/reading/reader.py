@@ -1,20 +1,37 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from stx.compiling.reading.chain import Chain
 from stx.compiling.reading.content import Content
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation
+from stx.utils.files import FileSignature
 
 
 class Reader:
 
     def __init__(self):
         self._chain_stack: List[Chain] = []
+        # Signatures of the files as they were read
+        self.signatures: Dict[str, FileSignature] = {}
 
     def push_file(self, file_path: str):
         self.push_files([file_path])
 
     def push_files(self, file_paths: List[str]):
-        self._chain_stack.append(Chain(file_paths))
+        self._chain_stack.append(
+            Chain(file_paths, signatures=self.signatures))
+
+    def push_content(self, content: Content):
+        self._chain_stack.append(Chain([], content))
+
+    def get_chain_count(self) -> int:
+        return len(self._chain_stack)
+
+    def has_pending_files(self) -> bool:
+        for chain in self._chain_stack:
+            if len(chain.file_paths) > 0:
+                return True
+
+        return False
 
     def active(self) -> bool:
         chain = self.get_chain()
@@ -51,7 +68,7 @@ class Reader:
 
         return content
 
-    def get_location(self) -> Optional[Location]:
+    def get_location(self) -> Optional[PackedLocation]:
         if not self.active():
             return None
 
@@ -3,19 +3,21 @@ from __future__ import annotations
 from typing import List, Optional, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class CapturedText(Component):
 
+    __slots__ = ('contents', 'class_')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             contents: List[Component],
             class_: Optional[str]):
-        self.location = location
+        super().__init__(location)
         self.contents = contents
         self.class_ = class_  # TODO this is deprecated
 
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from enum import Enum
 from io import StringIO
-from typing import List, Iterable, TextIO, Union, Optional
+from typing import List, Iterable, TextIO, Union, Optional, Tuple, Type
 
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation
 from stx.data_notation.values import Value
 from stx.utils.stx_error import StxError
 from stx.utils.tracked_dict import TrackedDict
 
 
+ComponentTypes = Union[Type['Component'], Tuple[Type['Component'], ...]]
+
+
 class DisplayMode(Enum):
     DEFAULT = 'default'
     INLINE = 'inline'
@@ -38,8 +41,12 @@ class DisplayMode(Enum):
 
 
 class Component:
-    ref: Union[str, List[str], None] = None
-    location: Optional[Location] = None
+
+    __slots__ = ('location', 'ref')
+
+    def __init__(self, location: Optional[PackedLocation]):
+        self.location = location
+        self.ref: Union[str, List[str], None] = None
 
     def get_refs(self) -> List[str]:
         if self.ref is None:
@@ -85,12 +92,44 @@ class Component:
 
         return output.getvalue()
 
-    def walk(self) -> Iterable[Component]:
-        for child in self.get_children():
-            yield child
-
-            for c in child.walk():
-                yield c
+    def walk(
+            self,
+            types: Optional[ComponentTypes] = None,
+            include_self=False) -> Iterable[Component]:
+        if include_self:
+            stack = [self]
+        else:
+            stack = list(reversed(self.get_children()))
+
+        while len(stack) > 0:
+            component = stack.pop()
+
+            if types is None or isinstance(component, types):
+                yield component
+
+            # Children are taken after the component is visited
+            stack.extend(reversed(component.get_children()))
+
+    def walk_post_order(
+            self,
+            types: Optional[ComponentTypes] = None,
+            include_self=False) -> Iterable[Component]:
+        if include_self:
+            stack = [(self, False)]
+        else:
+            stack = [(child, False) for child in reversed(self.get_children())]
+
+        while len(stack) > 0:
+            component, expanded = stack.pop()
+
+            if expanded:
+                if types is None or isinstance(component, types):
+                    yield component
+            else:
+                stack.append((component, True))
+                stack.extend(
+                    (child, False)
+                    for child in reversed(component.get_children()))
 
     def write_text(self, output: TextIO):
         raise NotImplementedError()
@@ -3,18 +3,20 @@ from __future__ import annotations
 from typing import List, Optional, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Composite(Component):
 
+    __slots__ = ('components',)
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             components: Optional[List[Component]] = None):
-        self.location = location
+        super().__init__(location)
         self.components = components if components is not None else []
 
     @property
@@ -3,15 +3,17 @@ from __future__ import annotations
 from typing import List, TextIO, Optional
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class ContentBox(Component):  # TODO rename to box
 
-    def __init__(self, location: Location):
-        self.location = location
+    __slots__ = ('content', 'style')
+
+    def __init__(self, location: PackedLocation):
+        super().__init__(location)
         self.content: Optional[Component] = None
         self.style = None
 
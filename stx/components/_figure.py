@@ -3,20 +3,22 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Figure(Component):
 
+    __slots__ = ('content', 'caption', 'number')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             content: Component,
             caption: Component):
         # TODO add flag for caption first or last
-        self.location = location
+        super().__init__(location)
         self.content = content
         self.caption = caption
         self.number = None
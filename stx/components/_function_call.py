@@ -3,21 +3,23 @@ from __future__ import annotations
 from typing import List, TextIO, Optional
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class FunctionCall(Component):
 
+    __slots__ = ('inline', 'key', 'options', 'argument', 'result')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             inline: bool,
             key: str,
             options: Value,
             argument: Optional[Component] = None):
-        self.location = location
+        super().__init__(location)
         self.inline = inline
         self.key = key
         self.options = options
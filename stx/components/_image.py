@@ -3,19 +3,21 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Image(Component):
 
+    __slots__ = ('src', 'alt')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             src: str,
             alt: str):
-        self.location = location
+        super().__init__(location)
         self.src = src
         self.alt = alt
 
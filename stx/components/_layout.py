@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.stx_error import StxError
 from ..utils.tracked_dict import TrackedDict
@@ -15,12 +15,14 @@ DIR_COLUMN = 'col'
 
 class Layout(Component):
 
+    __slots__ = ('components', 'direction')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             components: List[Component],
             direction: str):
-        self.location = location
+        super().__init__(location)
         self.components = components
 
         if direction not in [DIR_ROW, DIR_COLUMN]:
@@ -4,7 +4,7 @@ import re
 from typing import List, Optional, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
@@ -15,12 +15,14 @@ def is_url(ref: str) -> bool:
 
 class LinkText(Component):
 
+    __slots__ = ('contents', 'reference', 'invalid')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             contents: List[Component],
             reference: Optional[str]):
-        self.location = location
+        super().__init__(location)
         self.contents = contents
         self.reference = reference
         self.invalid = False
@@ -3,18 +3,20 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class ListBlock(Component):
 
+    __slots__ = ('ordered', 'items')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             ordered: bool):
-        self.location = location
+        super().__init__(location)
         self.ordered = ordered
         self.items: List[Component] = []
 
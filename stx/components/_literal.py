@@ -3,20 +3,22 @@ from __future__ import annotations
 from typing import List, TextIO, Optional
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Literal(Component):
 
+    __slots__ = ('text', 'lang', 'source')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             text: str,
             lang: Optional[str] = None,  # TODO remove this field
             source: Optional[str] = None):
-        self.location = location
+        super().__init__(location)
         self.text = text
         self.lang = lang
         self.source = source
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
@@ -12,8 +12,10 @@ from ..utils.tracked_dict import TrackedDict
 
 class Paragraph(Component):
 
-    def __init__(self, location: Location, contents: List[Component]):
-        self.location = location
+    __slots__ = ('contents',)
+
+    def __init__(self, location: PackedLocation, contents: List[Component]):
+        super().__init__(location)
         self.contents = contents
 
     @property
@@ -3,15 +3,17 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class PlainText(Component):
 
-    def __init__(self, location: Location, text: str):
-        self.location = location
+    __slots__ = ('content',)
+
+    def __init__(self, location: PackedLocation, text: str):
+        super().__init__(location)
         self.content = text
 
     @property
@@ -3,18 +3,20 @@ from __future__ import annotations
 from typing import List, TextIO, Optional
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Section(Component):
 
+    __slots__ = ('level', 'heading', 'content', 'type', 'number')
+
     def __init__(
             self,
-            location: Location,
+            location: PackedLocation,
             level: int):
-        self.location = location
+        super().__init__(location)
         self.level = level
         self.heading: Optional[Component] = None
         self.content: Optional[Component] = None
@@ -3,15 +3,17 @@ from __future__ import annotations
 from typing import List, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Separator(Component):
 
-    def __init__(self, location: Location):
-        self.location = location
+    __slots__ = ('level',)
+
+    def __init__(self, location: PackedLocation):
+        super().__init__(location)
         self.level = 0
 
     @property
@@ -4,15 +4,17 @@ from typing import List, Optional, TextIO
 
 from ._component import Component, DisplayMode
 from ._table_row import TableRow
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class Table(Component):
 
-    def __init__(self, location: Location):
-        self.location = location
+    __slots__ = ('rows', 'caption', 'number')
+
+    def __init__(self, location: PackedLocation):
+        super().__init__(location)
         self.rows: List[TableRow] = []
         self.caption: Optional[Component] = None
         self.number: Optional[str] = None
@@ -6,15 +6,17 @@ from ._component import Component, DisplayMode
 
 # TODO looks like this is not a component per se
 
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class TableRow(Component):
 
-    def __init__(self, location: Location, header: bool):
-        self.location = location
+    __slots__ = ('header', 'cells')
+
+    def __init__(self, location: PackedLocation, header: bool):
+        super().__init__(location)
         self.header = header
         self.cells: List[Component] = []
 
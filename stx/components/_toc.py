@@ -3,13 +3,15 @@ from __future__ import annotations
 from typing import List, Optional, TextIO
 
 from ._component import Component, DisplayMode
-from ..compiling.reading.location import Location
+from ..compiling.reading.location import PackedLocation
 from ..data_notation.values import Value
 from ..utils.tracked_dict import TrackedDict
 
 
 class ElementReference:
 
+    __slots__ = ('title', 'reference', 'number', 'elements')
+
     def __init__(self, title: str, reference: str, number: Optional[str]):
         self.title = title
         self.reference = reference
@@ -19,8 +21,10 @@ class ElementReference:
 
 class TableOfContents(Component):
 
-    def __init__(self, location: Location, title: Optional[str]):
-        self.location = location
+    __slots__ = ('title', 'elements')
+
+    def __init__(self, location: PackedLocation, title: Optional[str]):
+        super().__init__(location)
         self.title = title
         self.elements: List[ElementReference] = []
 
@@ -9,6 +9,7 @@ from stx.utils.stx_error import StxError
 TOKEN_DELIMITER_CHAR = '`'
 TOKEN_CHARS = string.ascii_letters + string.digits + '_-./'
 TOKEN_ESCAPE_CHAR = '\\'
+TOKEN_SPECIAL_CHARS = TOKEN_DELIMITER_CHAR + TOKEN_ESCAPE_CHAR
 ENTRY_SEPARATOR_CHAR = ':'
 GROUP_SEPARATOR_CHAR = ','
 GROUP_BEGIN_CHAR = '('
@@ -54,20 +55,20 @@ def parse_values(content: Content) -> List[Value]:
     can_be_none = True
 
     while True:
-        loc0 = content.get_location()
+        pos0 = content.position
 
         value = try_parse_item(content)
 
         if value is None:
             if can_be_none:
-                content.go_back(loc0)
+                content.go_back(pos0)
                 break
             else:
                 raise Exception('Expected to read a group item')
 
         items.append(value)
 
-        loc0 = content.get_location()
+        pos0 = content.position
 
         skip_void(content)
 
@@ -80,7 +81,7 @@ def parse_values(content: Content) -> List[Value]:
 
             can_be_none = False
         else:
-            content.go_back(loc0)
+            content.go_back(pos0)
             break
 
     return items
@@ -136,7 +137,7 @@ def try_parse_token_or_entry(
     if text is None:
         return None
 
-    loc0 = content.get_location()
+    pos0 = content.position
 
     skip_void(content)
 
@@ -161,7 +162,7 @@ def try_parse_token_or_entry(
         return Entry(text, group)
 
     # go before skipping void
-    content.go_back(loc0)
+    content.go_back(pos0)
 
     return Token(text)
 
@@ -170,25 +171,15 @@ def try_parse_text(content: Content) -> Optional[str]:
     c = content.peek()
 
     if c in TOKEN_CHARS:
-        out = StringIO()
-
-        while True:
-            out.write(c)
-
-            content.move_next()
-
-            c = content.peek()
-
-            if c is None or c not in TOKEN_CHARS:
-                break
-
-        return out.getvalue()
+        return content.read_while(TOKEN_CHARS)
     elif c == TOKEN_DELIMITER_CHAR:
         content.move_next()
 
         out = StringIO()
 
         while True:
+            out.write(content.read_until(TOKEN_SPECIAL_CHARS))
+
             c = content.peek()
 
             if c is None:
@@ -211,10 +202,6 @@ def try_parse_text(content: Content) -> Optional[str]:
                     # TODO add unicode support
 
                     raise Exception(f'Invalid escaped char: {c}')
-            else:
-                content.move_next()
-
-                out.write(c)
 
         return out.getvalue()
 
@@ -222,12 +209,4 @@ def try_parse_text(content: Content) -> Optional[str]:
 
 
 def skip_void(content: Content):
-    while True:
-        c = content.peek()
-
-        if c is None:
-            break
-        elif c in WHITESPACE_CHARS:
-            content.move_next()
-        else:
-            break
+    content.read_while(WHITESPACE_CHARS)
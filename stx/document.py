@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from typing import Dict
 from typing import List
 from typing import Optional
 
 from stx.action import Action
 from stx.components import Component
+from stx.utils.dependencies import DependencyGraph
+from stx.utils.timing import Timing
 
 
 class Document:
@@ -20,3 +23,6 @@ class Document:
         self.footer: Optional[Component] = None
         self.stylesheets: List[str] = []
         self.actions: List[Action] = []
+        self.function_timings: Dict[str, Timing] = {}
+
+        self.dependencies = DependencyGraph(source_file)
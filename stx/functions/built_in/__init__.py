@@ -4,7 +4,9 @@ from ._admonition import resolve_information  # noqa: F401
 from ._code import resolve_code  # noqa: F401
 from ._custom_style import resolve_custom_style  # noqa: F401
 from ._embed import resolve_embed  # noqa: F401
+from ._embed import get_embed_revision  # noqa: F401
 from ._layout import layout_function  # noqa: F401
 from ._image import resolve_image  # noqa: F401
 from ._line_feed import resolve_line_feed  # noqa: F401
+from ._toc import generate_toc  # noqa: F401
 from ._toc import resolve_toc  # noqa: F401
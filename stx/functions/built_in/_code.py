@@ -3,7 +3,7 @@ from typing import List
 from gramat.errors import GramatError
 from gramat.lexing.nodes import SyntaxNode, ContainerNode, TokenNode
 
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation
 from stx.functions import utils
 from stx.components import FunctionCall, Component, CodeBlock, \
     PlainText, CustomText
@@ -12,7 +12,7 @@ from stx.grammars import registry
 
 
 def generate_component(
-        location: Location,
+        location: PackedLocation,
         nodes: List[SyntaxNode],
         components: List[Component]):
     for node in nodes:
@@ -1,12 +1,17 @@
+import os
+from typing import Any
+
 from stx import logger
+from stx.compiling.reading.location import get_location_file
 from stx.functions import utils
 from stx.components import Component, FunctionCall, Literal
 from stx.document import Document
+from stx.utils.dependencies import EMBED
 from stx.utils.files import resolve_sibling
 from stx.utils.stx_error import StxError
 
 
-def resolve_embed(document: Document, call: FunctionCall) -> Component:
+def get_embed_source(document: Document, call: FunctionCall) -> str:
     options = utils.make_options_dict(call, 'src')
 
     src = options.pop('src', None)
@@ -16,10 +21,28 @@ def resolve_embed(document: Document, call: FunctionCall) -> Component:
     if src is None:
         raise StxError(f'Missing `src` parameter in embed.', call.location)
 
-    src = resolve_sibling(document.source_file, src)
+    return resolve_sibling(document.source_file, src)
+
 
+def get_embed_revision(document: Document, call: FunctionCall) -> Any:
+    src = get_embed_source(document, call)
+
+    # Done here since it runs even when the result is reused
     logger.info(f'Embedding: {src}')
 
+    document.dependencies.add(get_location_file(call.location), src, EMBED)
+
+    try:
+        stat = os.stat(src)
+    except OSError:
+        return src, None
+
+    return src, stat.st_mtime_ns, stat.st_size
+
+
+def resolve_embed(document: Document, call: FunctionCall) -> Component:
+    src = get_embed_source(document, call)
+
     with open(src, 'r', encoding='UTF-8') as f:
         text = f.read()
 
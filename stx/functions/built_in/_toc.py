@@ -1,6 +1,6 @@
 from stx.functions import utils
 from stx.components import FunctionCall
-from typing import List
+from typing import Dict, List
 
 from stx.components import Component, TableOfContents, ElementReference, \
     Section, Composite
@@ -25,22 +25,29 @@ def resolve_toc(document: Document, call: FunctionCall) -> Component:
 
 
 def generate_toc(document: Document, toc: TableOfContents):
-    if document.content is not None:
-        collect_section_toc(document.content, toc.elements)
-
-
-def collect_section_toc(
-        component: Component, elements: List[ElementReference]):
-    if isinstance(component, Section):
-        element = ElementReference(
-            title=component.heading.get_text().strip(),
-            reference=component.get_main_ref(),
-            number=component.number,
-        )
-
-        elements.append(element)
-
-        collect_section_toc(component.content, element.elements)
-    elif isinstance(component, Composite):
-        for child in component.components:
-            collect_section_toc(child, elements)
+    if document.content is None:
+        return
+
+    # Only sections reached through composites and sections are listed
+    targets: Dict[int, List[ElementReference]] = {
+        id(document.content): toc.elements,
+    }
+
+    for component in document.content.walk(include_self=True):
+        elements = targets.pop(id(component), None)
+
+        if elements is None:
+            continue
+        elif isinstance(component, Section):
+            element = ElementReference(
+                title=component.heading.get_text().strip(),
+                reference=component.get_main_ref(),
+                number=component.number,
+            )
+
+            elements.append(element)
+
+            targets[id(component.content)] = element.elements
+        elif isinstance(component, Composite):
+            for child in component.components:
+                targets[id(child)] = elements
@@ -1,38 +1,54 @@
+import sys
+import time
+from collections import deque
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from typing import Iterable, List, Optional
+
 from stx.functions import registry
+from stx.functions.registry import FunctionCache, FunctionType
+from stx.functions.registry import make_call_key
 from stx.components import Component, FunctionCall
 from stx.document import Document
 from stx.utils.stx_error import StxError
 from stx.utils.debug import see
+from stx.utils.timing import Timing
 
 
-def resolve_document(document: Document) -> int:
-    count = 0
-
-    if document.content is not None:
-        count += resolve_component(document, document.content)
+def resolve_calls(
+        document: Document,
+        calls: Iterable[FunctionCall],
+        defer=False,
+        cache: Optional[FunctionCache] = None) -> List[FunctionCall]:
+    resolved_calls = []
+    worklist = deque(calls)
 
-    return count
+    while len(worklist) > 0:
+        call = worklist.popleft()
 
+        if defer and registry.is_deferred(call.key):
+            continue
+        elif not resolve_function_call(document, call, cache):
+            continue
 
-def resolve_component(document: Document, component: Component) -> int:
-    count = 0
-    children = component.get_children()
+        resolved_calls.append(call)
 
-    # Resolve children first
-    for child in children:
-        count += resolve_component(document, child)
+        # Calls produced by the result are resolved right after it
+        worklist.extendleft(reversed([
+            c for c in call.result.walk(FunctionCall, include_self=True)
+            if c.result is None
+        ]))
 
-    # Resolve function then
-    if isinstance(component, FunctionCall):
-        count += resolve_function_call(document, component)
+    return resolved_calls
 
-    return count
 
-
-def resolve_function_call(document: Document, call: FunctionCall):
+def resolve_function_call(
+        document: Document,
+        call: FunctionCall,
+        cache: Optional[FunctionCache] = None) -> bool:
     # Check if it is already resolved
     if call.result is not None:
-        return 0
+        return False
 
     processor = registry.get(call.key)
 
@@ -40,9 +56,56 @@ def resolve_function_call(document: Document, call: FunctionCall):
         raise StxError(
             f'Function not found: {see(call.key)}', call.location)
 
-    call.result = processor(document, call)
+    start = time.perf_counter()
+
+    if registry.is_pure(call.key):
+        call.result = call_pure_function(document, call, processor, cache)
+    else:
+        call.result = processor(document, call)
+
+    timing = document.function_timings.get(call.key)
+
+    if timing is None:
+        timing = Timing()
+        document.function_timings[call.key] = timing
+
+    timing.add(time.perf_counter() - start)
 
     if call.result is None:
         raise call.error('Function call did not produce a component.')
 
-    return 1 + resolve_component(document, call.result)
+    return True
+
+
+def call_pure_function(
+        document: Document,
+        call: FunctionCall,
+        processor: FunctionType,
+        cache: Optional[FunctionCache]) -> Component:
+    key = make_call_key(document, call)
+
+    if cache is not None:
+        result = cache.get(key, call)
+
+        if result is not None:
+            return result
+
+    output = StringIO()
+    errors = StringIO()
+
+    try:
+        with redirect_stdout(output), redirect_stderr(errors):
+            result = processor(document, call)
+    finally:
+        sys.stdout.write(output.getvalue())
+        sys.stderr.write(errors.getvalue())
+
+    # Results that logged something are not reused, so the log stays
+    #   the same as resolving every call.
+    if (cache is not None
+            and result is not None
+            and output.tell() == 0
+            and errors.tell() == 0):
+        cache.put(key, call, result)
+
+    return result
@@ -1,9 +1,13 @@
-from typing import Callable, Dict, Optional
+import json
+import pickle
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from stx.functions.built_in import resolve_code
 from stx.functions.built_in import resolve_custom_style
 from stx.functions.built_in import resolve_toc
-from stx.functions.built_in import resolve_embed
+from stx.functions.built_in import resolve_embed, get_embed_revision
 from stx.functions.built_in import resolve_image
 from stx.functions.built_in import resolve_warning
 from stx.functions.built_in import resolve_admonition
@@ -14,21 +18,172 @@ from stx.functions.built_in import layout_function
 from stx.components import Component, FunctionCall
 
 from stx.document import Document
+from stx.grammars import registry as grammars
 from stx.utils.stx_error import StxError
 
 
 FunctionType = Callable[[Document, FunctionCall], Component]
 
+RevisionType = Callable[[Document, FunctionCall], Any]
+
 
 _functions: Dict[str, FunctionType] = {}
 
+# Functions that depend on the rest of the document being resolved
+_deferred_keys: Set[str] = set()
+
+# Functions whose result depends only on their options and argument
+_pure_keys: Set[str] = set()
+
+# State other than the call that the result of a pure function depends on,
+#   computed once for every call, even when the result is reused.
+_revisions: Dict[str, RevisionType] = {}
 
-def add(function_key: str, function: FunctionType, override=False):
+DEFAULT_FUNCTION_CACHE_SIZE = 1024
+
+
+def add(
+        function_key: str,
+        function: FunctionType,
+        override=False,
+        deferred=False,
+        pure=False,
+        revision: Optional[RevisionType] = None):
     if not override and function_key in _functions:
         raise StxError(f'Function is already registered: {function_key}')
 
     _functions[function_key] = function
 
+    for keys, flag in [(_deferred_keys, deferred), (_pure_keys, pure)]:
+        if flag:
+            keys.add(function_key)
+        else:
+            keys.discard(function_key)
+
+    if revision is not None:
+        _revisions[function_key] = revision
+    else:
+        _revisions.pop(function_key, None)
+
+
+def is_deferred(function_key: str) -> bool:
+    return function_key in _deferred_keys
+
+
+def is_pure(function_key: str) -> bool:
+    return function_key in _pure_keys
+
+
+class FunctionCache:
+
+    def __init__(self, max_size: int = DEFAULT_FUNCTION_CACHE_SIZE):
+        self.max_size = max_size
+        # Pickled results and the indexes of the components at the call
+        self._entries: OrderedDict[Tuple, Tuple[bytes, List[int]]] = \
+            OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple, call: FunctionCall) -> Optional[Component]:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        self._entries.move_to_end(key)
+
+        data, indexes = entry
+        result = _ResultUnpickler(BytesIO(data), call).load()
+        components = get_owned_components(result, call)
+
+        for index in indexes:
+            components[index].location = call.location
+
+        return result
+
+    def put(self, key: Tuple, call: FunctionCall, result: Component):
+        data = BytesIO()
+
+        _ResultPickler(data, call).dump(result)
+
+        # The location of the call is only an int, so it is set again
+        #   instead of being shared like the components.
+        indexes = [
+            index
+            for index, component in enumerate(
+                get_owned_components(result, call))
+            if component.location == call.location
+        ]
+
+        self._entries[key] = data.getvalue(), indexes
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+def make_call_key(document: Document, call: FunctionCall) -> Tuple:
+    options = json.dumps(call.options.to_any(), sort_keys=True)
+
+    if call.argument is not None:
+        argument = (
+            call.argument.get_text(),
+            tuple(type(c).__name__ for c in get_call_references(call)),
+        )
+    else:
+        argument = None
+
+    revision = _revisions.get(call.key)
+
+    if revision is not None:
+        return call.key, options, argument, revision(document, call)
+
+    return call.key, options, argument
+
+
+def get_call_references(call: FunctionCall) -> List[Component]:
+    # Components that the result shares with its call instead of owning them
+    if call.argument is None:
+        return []
+
+    return list(call.argument.walk(include_self=True))
+
+
+def get_owned_components(
+        result: Component, call: FunctionCall) -> List[Component]:
+    references = {id(reference) for reference in get_call_references(call)}
+
+    return [
+        component
+        for component in result.walk(include_self=True)
+        if id(component) not in references
+    ]
+
+
+class _ResultPickler(pickle.Pickler):
+
+    def __init__(self, file: BytesIO, call: FunctionCall):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._references = get_call_references(call)
+        self._indexes = {
+            id(reference): index
+            for index, reference in enumerate(self._references)
+        }
+
+    def persistent_id(self, obj: Any) -> Optional[int]:
+        return self._indexes.get(id(obj))
+
+
+class _ResultUnpickler(pickle.Unpickler):
+
+    def __init__(self, file: BytesIO, call: FunctionCall):
+        super().__init__(file)
+        self._references = get_call_references(call)
+
+    def persistent_load(self, pid: Any) -> Any:
+        return self._references[pid]
+
 
 def get(function_key: str) -> Optional[FunctionType]:
     if function_key not in _functions:
@@ -38,15 +193,16 @@ def get(function_key: str) -> Optional[FunctionType]:
 
 # Built-in
 
-add('img', resolve_image)
-add('image', resolve_image)
-add('code', resolve_code)
+add('img', resolve_image, pure=True)
+add('image', resolve_image, pure=True)
+add('code', resolve_code, pure=True,
+    revision=lambda document, call: grammars.get_revision())
 add('warning', resolve_warning)
 add('info', resolve_information)
 add('information', resolve_information)
 add('admonition', resolve_admonition)
 add('br', resolve_line_feed)
 add('style', resolve_custom_style)
-add('toc', resolve_toc)
-add('embed', resolve_embed)
+add('toc', resolve_toc, deferred=True)
+add('embed', resolve_embed, pure=True, revision=get_embed_revision)
 add('layout', layout_function)
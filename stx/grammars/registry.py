@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from functools import partial
+from importlib import metadata
+from typing import Callable, Dict, List, Optional, Tuple
 
 from gramat.compiling.compiler import compile_source
 from gramat.expressions import EvalContext
@@ -9,24 +15,123 @@ from gramat.lexing.lexer import generate_nodes
 from gramat.lexing.nodes import SyntaxNode
 from gramat.options import Options
 from gramat.parsing.source import Source
-from gramat.actions import compile_file
 
 from stx import resources, logger
+from stx.utils.debug import see
+
+DEFAULT_TOKENS_CACHE_SIZE = 256
+
+# Directory of the compiled grammars, only kept in memory if not set
+cache_directory: Optional[str] = None
+
+_compiled: Dict[str, Grammar] = {}
+
+# Increased every time a language changes its grammar
+_revision = 0
+
+
+def get_gramat_version() -> str:
+    try:
+        return metadata.version('gramat')
+    except metadata.PackageNotFoundError:
+        return '?'
+
+
+def compile_grammar(code: str, src: str) -> Tuple[Grammar, str]:
+    key = hashlib.sha1()
+    key.update(get_gramat_version().encode('utf-8'))
+    key.update(code.encode('utf-8'))
+
+    digest = key.hexdigest()
+    grammar = _compiled.get(digest)
+
+    if grammar is None:
+        grammar = _read_grammar(digest)
+
+        if grammar is None:
+            grammar = compile_source(Source(code, src=src), Options())
+
+            _write_grammar(digest, grammar)
+
+        _compiled[digest] = grammar
+
+    return grammar, digest
+
+
+def _read_grammar(digest: str) -> Optional[Grammar]:
+    if cache_directory is None:
+        return None
+
+    try:
+        with open(os.path.join(cache_directory, digest), mode='rb') as stream:
+            return pickle.load(stream)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f'Ignoring compiled grammar {see(digest)}: {e}')
+        return None
+
+
+def _write_grammar(digest: str, grammar: Grammar):
+    if cache_directory is None:
+        return
+
+    grammar_path = os.path.join(cache_directory, digest)
+    temp_path = f'{grammar_path}.{os.getpid()}.tmp'
+
+    os.makedirs(cache_directory, exist_ok=True)
+
+    with open(temp_path, mode='wb') as stream:
+        pickle.dump(grammar, stream, pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, grammar_path)
 
 
 def load_grammar(res_path: str) -> Grammar:
     code = resources.get_text(res_path)
-    source = Source(code, src=res_path)
-    return compile_source(source, Options())
+
+    grammar, _ = compile_grammar(code, res_path)
+
+    return grammar
 
 
 class GrammarReference:
 
-    def __init__(self, grammar: Grammar, rule_name: str):
-        self.grammar = grammar
+    def __init__(
+            self,
+            loader: Callable[[], Grammar],
+            rule_name: str,
+            digest: Optional[str] = None):
         self.rule_name = rule_name
+        self.digest = digest
+        self._loader = loader
+        self._grammar: Optional[Grammar] = None
+        self._tokens: OrderedDict[str, List[SyntaxNode]] = OrderedDict()
+
+    @property
+    def grammar(self) -> Grammar:
+        if self._grammar is None:
+            self._grammar = self._loader()
+
+        return self._grammar
 
     def tokenize(self, content: str) -> List[SyntaxNode]:
+        nodes = self._tokens.get(content)
+
+        if nodes is not None:
+            self._tokens.move_to_end(content)
+            return list(nodes)
+
+        nodes = self._tokenize(content)
+
+        self._tokens[content] = nodes
+
+        if len(self._tokens) > DEFAULT_TOKENS_CACHE_SIZE:
+            self._tokens.popitem(last=False)
+
+        return list(nodes)
+
+    def _tokenize(self, content: str) -> List[SyntaxNode]:
         rule = self.grammar.get_rule(self.rule_name)
 
         source = Source(content)
@@ -44,24 +149,45 @@ class GrammarReference:
         return generate_nodes(source, context.matches)
 
 
+# Built-in grammars are compiled the first time they are used
 _registry: Dict[str, GrammarReference] = {
-    'stx': GrammarReference(load_grammar('grammars/stx.gmt'), 'stx'),
-    'json': GrammarReference(load_grammar('grammars/json.gmt'), 'json'),
-    'gramat': GrammarReference(load_grammar('grammars/gramat.gmt'), 'gramat'),
+    lang: GrammarReference(partial(load_grammar, f'grammars/{lang}.gmt'), lang)
+    for lang in ['stx', 'json', 'gramat']
 }
 
 
 def register_grammar(lang: str, grammar: Grammar, rule_name: str):
-    _registry[lang] = GrammarReference(grammar, rule_name)
+    global _revision
+
+    _registry[lang] = GrammarReference(lambda: grammar, rule_name)
+    _revision += 1
 
     logger.info(f'Registered grammar for {lang} lang.')
 
 
 def register_grammar_from_file(lang: str, gramat_file: str, rule_name: str):
-    grammar = compile_file(gramat_file)
+    global _revision
+
+    with open(gramat_file, mode='r') as stream:
+        code = stream.read()
 
-    register_grammar(lang, grammar, rule_name)
+    grammar, digest = compile_grammar(code, gramat_file)
+    current = _registry.get(lang)
+
+    # Rebuilds keep the tokens of an unchanged grammar
+    if (current is None
+            or current.digest != digest
+            or current.rule_name != rule_name):
+        _registry[lang] = GrammarReference(
+            lambda: grammar, rule_name, digest)
+        _revision += 1
+
+    logger.info(f'Registered grammar for {lang} lang.')
 
 
 def get_grammar(lang: str) -> Optional[GrammarReference]:
     return _registry.get(lang)
+
+
+def get_revision() -> int:
+    return _revision
@@ -1,17 +1,22 @@
 import sys
 
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation, expand_location
 
 
-def debug(message: str, location: Location = None):
-    print(message if location is None else location.decorate(message))
+def decorate(message: str, location: PackedLocation = None):
+    if location is None:
+        return message
 
+    return expand_location(location).decorate(message)
 
-def info(message: str, location: Location = None):
-    print(message if location is None else location.decorate(message))
 
+def debug(message: str, location: PackedLocation = None):
+    print(decorate(message, location))
 
-def warning(message: str, location: Location = None):
-    print(
-        message if location is None else location.decorate(message),
-        file=sys.stderr)
+
+def info(message: str, location: PackedLocation = None):
+    print(decorate(message, location))
+
+
+def warning(message: str, location: PackedLocation = None):
+    print(decorate(message, location), file=sys.stderr)
@@ -0,0 +1,29 @@
+from typing import List, TextIO
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+class OutputBuffer:
+
+    def __init__(self, out: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self._out = out
+        self._chunks: List[str] = []
+        self._length = 0
+        self.buffer_size = buffer_size
+
+    def write(self, text: str) -> int:
+        self._chunks.append(text)
+        self._length += len(text)
+
+        if self._length >= self.buffer_size:
+            self.flush()
+
+        return len(text)
+
+    def flush(self):
+        if len(self._chunks) > 0:
+            self._out.write(''.join(self._chunks))
+            self._chunks.clear()
+            self._length = 0
+
+        self._out.flush()
@@ -91,29 +91,154 @@ class Tag(Element):
         return self._children
 
     def render(self, out: TextIO):
-        out.write('<')
-        out.write(self.name)
+        write_start_tag(self.name, self._attributes, out)
 
-        if self._attributes is not None and len(self._attributes) > 0:
-            out.write(' ')
+        if self._children is not None and len(self._children) > 0:
+            for child in self._children:
+                child.render(out)
 
-            for index, (key, value) in enumerate(self._attributes.items()):
-                if index > 0:
-                    out.write(' ')
-                out.write(key)
+            write_end_tag(self.name, out)
 
-                if value is not None:
-                    out.write('=')
-                    out.write('"')
-                    write_text(value, out)
-                    out.write('"')
 
-        out.write('>')
+class StreamTag(Tag):
+
+    def __init__(
+            self,
+            stream: HtmlStream,
+            name: str,
+            attributes: Dict[str, Any] = None,
+            content: Optional[Element] = None):
+        super().__init__(name, attributes=attributes)
+        self._stream = stream
+        self._content = content
+        self._started = False
+        self._closed = False
+        self._empty = True
+
+    def __setitem__(self, key: str, value: Any):
+        if self._started:
+            raise Exception(f'Tag already written: {self.name}')
+
+        self.attributes[key] = value
+
+    def append_tag(
+            self,
+            name: str,
+            attributes: Dict[str, Any] = None,
+            *args,
+            text: str = None,
+            text_literal=False) -> Tag:
+        self._enter()
+
+        if text is not None:
+            if text_literal:
+                content = Literal(text)
+            else:
+                content = Text(text)
+        else:
+            content = None
+
+        return self._stream.push(StreamTag(
+            self._stream, name, attributes=attributes, content=content))
+
+    def append_text(self, value: str) -> Text:
+        self._enter()
+
+        element = Text(value)
+        element.render(self._stream.out)
+        return element
+
+    def append_literal(self, value: str) -> Literal:
+        self._enter()
+
+        element = Literal(value)
+        element.render(self._stream.out)
+        return element
+
+    @property
+    def children(self) -> List[Element]:
+        raise Exception('Children of streamed tags are not kept.')
+
+    def render(self, out: TextIO):
+        raise Exception('Streamed tags are already written.')
+
+    def _enter(self):
+        if self._closed:
+            raise Exception(f'Tag already closed: {self.name}')
+
+        self._stream.close_above(self)
+        self._start()
+        self._empty = False
+
+    def _start(self):
+        if self._started:
+            return
+
+        write_start_tag(self.name, self._attributes, self._stream.out)
+
+        if self._content is not None:
+            self._content.render(self._stream.out)
+            self._empty = False
+
+        self._started = True
+
+    def close(self):
+        self._start()
+
+        if not self._empty:
+            write_end_tag(self.name, self._stream.out)
+
+        self._closed = True
+
+
+class HtmlStream:
+
+    def __init__(self, out: TextIO):
+        self.out = out
+        self._open_tags: List[StreamTag] = []
+
+    def append_tag(
+            self, name: str, attributes: Dict[str, Any] = None) -> StreamTag:
+        self.close()
+
+        return self.push(StreamTag(self, name, attributes=attributes))
+
+    def push(self, tag: StreamTag) -> StreamTag:
+        self._open_tags.append(tag)
+        return tag
+
+    def close_above(self, tag: StreamTag):
+        while self._open_tags[-1] is not tag:
+            self._open_tags.pop().close()
+
+    def close(self):
+        while len(self._open_tags) > 0:
+            self._open_tags.pop().close()
+
+
+def write_start_tag(
+        name: str, attributes: Optional[Dict[str, Any]], out: TextIO):
+    out.write('<')
+    out.write(name)
+
+    if attributes is not None and len(attributes) > 0:
+        out.write(' ')
+
+        for index, (key, value) in enumerate(attributes.items()):
+            if index > 0:
+                out.write(' ')
+            out.write(key)
+
+            if value is not None:
+                out.write('=')
+                out.write('"')
+                write_text(value, out)
+                out.write('"')
+
+    out.write('>')
 
-        if self._children is not None and len(self._children) > 0:
-            for child in self._children:
-                child.render(out)
 
-            out.write('</')
-            out.write(self.name)
-            out.write('>')
+def write_end_tag(name: str, out: TextIO):
+    out.write('</')
+    out.write(name)
+    out.write('>')
@@ -1,4 +1,5 @@
-from typing import TextIO, Any
+import re
+from typing import TextIO, Any, Dict
 
 entities = {
     # Main Entities
@@ -48,18 +49,32 @@ entities = {
 }
 
 
+def _make_translation_table() -> Dict[int, str]:
+    table = {}
+
+    # Non-text control codes
+    for code in [*range(0, 32), *range(127, 160)]:
+        if code not in [9, 10, 13]:
+            table[code] = f'&#{code};'
+
+    table.update(entities)
+
+    return table
+
+
+translation_table = _make_translation_table()
+
+escape_pattern = re.compile(
+    '[' + re.escape(''.join(chr(code) for code in translation_table)) + ']')
+
+
 def write_text(value: Any, out: TextIO):
     if value is None:
         return
 
-    for c in str(value):
-        code = ord(c)
-        entity = entities.get(code)
-
-        if entity is not None:
-            out.write(entity)
-        # Non-text control codes
-        elif code not in [9, 10, 13] and (code <= 31 or (127 <= code <= 159)):
-            out.write(f'&#{code};')
-        else:
-            out.write(c)
+    text = str(value)
+
+    if escape_pattern.search(text) is None:
+        out.write(text)
+    else:
+        out.write(text.translate(translation_table))
@@ -1,6 +1,6 @@
 from typing import TextIO
 
-from stx.outputs.html.serializer import document_to_html
+from stx.outputs.html.serializer import write_html
 from stx.outputs.html.themes import HtmlTheme, NullHtmlTheme
 from stx.outputs.output_action import OutputAction
 from stx.themes.registry import get_theme
@@ -18,9 +18,6 @@ class HtmlOutputAction(OutputAction):
         else:
             theme = NullHtmlTheme()
 
-        html = document_to_html(self.document, theme)
-
-        for tag in html:
-            tag.render(out)
+        write_html(self.document, theme, out)
 
         # TODO implement pretty-print
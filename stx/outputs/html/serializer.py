@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, TextIO
 
-from stx import app, logger
+from stx import logger
 from stx.components import (
     Component, Composite, CodeBlock, Table, Image,
     FunctionCall, CustomText, Layout)
@@ -9,9 +9,10 @@ from stx.components import LinkText, Literal, Figure, Section, Separator
 from stx.components import ContentBox, TableOfContents, ElementReference
 from stx.components import CapturedText
 from stx.document import Document
-from stx.outputs.html.dom import Tag
+from stx.outputs.html.dom import Tag, HtmlStream
 from stx.outputs.html.themes import HtmlTheme
 from stx.utils.stx_error import StxError
+from stx.version import app_title
 
 TYPE_H_TAGS = {
     'chapter': 'h1',
@@ -40,6 +41,23 @@ def document_to_html(document: Document, theme: HtmlTheme) -> List[Tag]:
     return [Tag('!DOCTYPE html'), html]
 
 
+def write_html(document: Document, theme: HtmlTheme, out: TextIO):
+    logger.info('Serializing HTML5 book...')
+
+    # Tags are written as soon as they are complete, no tree is kept
+    stream = HtmlStream(out)
+
+    stream.append_tag('!DOCTYPE html')
+
+    html = stream.append_tag('html')
+
+    generate_head(document, html, theme)
+
+    generate_body(document, html, theme)
+
+    stream.close()
+
+
 def generate_head(document: Document, html: Tag, theme: HtmlTheme):
     head = html.append_tag('head')
 
@@ -54,7 +72,7 @@ def generate_head(document: Document, html: Tag, theme: HtmlTheme):
 
     head.append_tag('meta', {
         'name': 'generator',
-        'content': app.app_title,
+        'content': app_title,
     })
 
     if document.title:
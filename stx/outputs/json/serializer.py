@@ -1,6 +1,6 @@
 from typing import Optional, List
 
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation, expand_location
 from stx.components import Component, Composite, CodeBlock, Table, Image, \
     FunctionCall, CustomText
 from stx.components import ListBlock, Paragraph, PlainText, StyledText
@@ -11,7 +11,10 @@ from stx.document import Document
 from stx.utils.stx_error import StxError
 
 
-def location_to_json(location: Optional[Location]) -> Optional[dict]:
+def location_to_json(
+        packed: Optional[PackedLocation]) -> Optional[dict]:
+    location = expand_location(packed)
+
     if location is None:
         return None
 
@@ -1,25 +1,32 @@
 from __future__ import annotations
 
+import os
+import stat
 import sys
+import tempfile
 from typing import TextIO, Optional
 
 from stx.action import Action
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation
 from stx.data_notation.values import Value
 from stx.document import Document
+from stx.outputs.buffer import OutputBuffer, DEFAULT_BUFFER_SIZE
 from stx.utils.files import resolve_sibling
 
 
 class OutputTarget:
 
     @staticmethod
-    def make(document: Document, target: str) -> OutputTarget:
+    def make(
+            document: Document,
+            target: str,
+            buffer_size: int = DEFAULT_BUFFER_SIZE) -> OutputTarget:
         # TODO add more targets
 
         file_path = resolve_sibling(
             document.source_file, target)
 
-        return OutputFile(file_path)
+        return OutputFile(file_path, buffer_size)
 
     def dump(self, handler: OutputAction):
         raise NotImplementedError()
@@ -27,18 +34,74 @@ class OutputTarget:
 
 class OutputFile(OutputTarget):
 
-    def __init__(self, file_path: str):
+    def __init__(
+            self, file_path: str, buffer_size: int = DEFAULT_BUFFER_SIZE):
         self.file_path = file_path
+        self.buffer_size = buffer_size
+
+    def writes(self, file_path: str) -> bool:
+        target_path = os.path.abspath(self.file_path)
+
+        if file_path == target_path:
+            return True
+
+        # Temporary files of the target, see dump
+        dir_path, file_name = os.path.split(target_path)
+
+        return (os.path.dirname(file_path) == dir_path
+                and os.path.basename(file_path).startswith(f'.{file_name}.')
+                and file_path.endswith('.tmp'))
 
     def dump(self, handler: OutputAction):
-        with open(self.file_path, mode='w') as out:
-            handler.dump(out)
+        dir_path, file_name = os.path.split(self.file_path)
+
+        # Unique name, concurrent builds of the same target do not clash
+        fd, temp_path = tempfile.mkstemp(
+            prefix=f'.{file_name}.', suffix='.tmp', dir=dir_path or None)
+
+        try:
+            with os.fdopen(fd, mode='w') as stream:
+                out = OutputBuffer(stream, self.buffer_size)
+
+                handler.dump(out)
+
+                out.flush()
+
+            os.chmod(temp_path, get_target_mode(self.file_path))
+
+            # Readers never see a partially written file
+            os.replace(temp_path, self.file_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def get_target_mode(file_path: str) -> int:
+    try:
+        # The replaced file keeps its permissions
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        pass
+
+    # Same mode as a file created by open()
+    umask = os.umask(0)
+    os.umask(umask)
+
+    return 0o666 & ~umask
 
 
 class OutputStdOut(OutputTarget):
 
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+
     def dump(self, handler: OutputAction):
-        handler.dump(sys.stdout)
+        out = OutputBuffer(sys.stdout, self.buffer_size)
+
+        handler.dump(out)
+
+        out.flush()
 
 
 class OutputAction(Action):
@@ -46,7 +109,7 @@ class OutputAction(Action):
     def __init__(
             self,
             document: Document,
-            location: Location,
+            location: PackedLocation,
             format_key: str,
             target: OutputTarget,
             options: Value,
@@ -1,9 +1,10 @@
 from typing import Dict, Type
 
 from stx import logger
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation
 from stx.data_notation.values import Value, Empty
 from stx.document import Document
+from stx.outputs.buffer import DEFAULT_BUFFER_SIZE
 from stx.outputs.html.output import HtmlOutputAction
 from stx.outputs.json.output import JsonOutputAction
 from stx.outputs.output_action import OutputAction, OutputStdOut
@@ -30,7 +31,7 @@ def get_type(format_key: str) -> Type[OutputAction]:
 
 def make_output_action(
         document: Document,
-        location: Location,
+        location: PackedLocation,
         arguments: Value) -> OutputAction:
     format_value = arguments.try_token()
 
@@ -46,6 +47,7 @@ def make_output_action(
         target_value = args_map.pop('target', None)
         theme_value = args_map.pop('theme', None)
         options_value = args_map.pop('options', None)
+        buffer_value = args_map.pop('buffer', None)
 
         if len(args_map) > 0:
             for unknown_key in args_map.keys():
@@ -58,11 +60,16 @@ def make_output_action(
         else:
             raise StxError('Expected output format.', location)
 
+        if buffer_value is not None:
+            buffer_size = parse_buffer_size(buffer_value, location)
+        else:
+            buffer_size = DEFAULT_BUFFER_SIZE
+
         if target_value is not None:
             actual_target = OutputTarget.make(
-                document, target_value.to_str())
+                document, target_value.to_str(), buffer_size)
         else:
-            actual_target = OutputStdOut()
+            actual_target = OutputStdOut(buffer_size)
 
         if theme_value is not None:
             actual_theme = theme_value.to_str()
@@ -86,6 +93,15 @@ def make_output_action(
     )
 
 
+def parse_buffer_size(value: Value, location: PackedLocation) -> int:
+    text = value.to_str()
+
+    if not text.isdigit() or int(text) == 0:
+        raise StxError(f'Invalid buffer size: {see(text)}', location)
+
+    return int(text)
+
+
 # Built-in renderers
 register_type('html', HtmlOutputAction)
 register_type('json', JsonOutputAction)
@@ -1,10 +1,13 @@
-import pkg_resources
+import pkgutil
 
 
 def get_text(name: str) -> str:
     try:
-        content = pkg_resources.resource_string(__name__, 'data/' + name)
-        text = content.decode('utf-8')
-        return text
+        content = pkgutil.get_data(__name__, 'data/' + name)
     except FileNotFoundError:
+        content = None
+
+    if content is None:
         raise Exception(f'Resource not found: {name}')
+
+    return content.decode('utf-8')
@@ -0,0 +1,165 @@
+import json
+import os
+import socketserver
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO, TextIOWrapper
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from stx import logger
+from stx.compiling.compiler import compile_document
+from stx.compiling.parsing.units import UnitCache
+from stx.data_notation.values import Empty
+from stx.functions.registry import FunctionCache
+from stx.outputs import OutputAction, OutputFile
+from stx.outputs.output_action import OutputStdOut
+from stx.outputs.registry import get_type
+from stx.utils.debug import see
+
+Request = Dict[str, Any]
+Response = Dict[str, Any]
+
+
+class CompileServer:
+
+    def __init__(self, cache: UnitCache):
+        self.cache = cache
+        self.function_cache = FunctionCache()
+
+        # The compiler uses shared registries and redirects the log, so
+        #   the requests of every client are compiled one at a time.
+        self.lock = threading.Lock()
+
+    def handle(self, request: Request) -> Response:
+        response: Response = {
+            'id': request.get('id'),
+            'ok': False,
+            'output': None,
+            'files': [],
+            'log': [],
+            'warnings': [],
+            'error': None,
+        }
+
+        input_file = request.get('file')
+        format_key = request.get('format')
+
+        if not isinstance(input_file, str):
+            response['error'] = 'Expected the input file.'
+            return response
+
+        output = StringIO()
+        errors = StringIO()
+
+        with self.lock:
+            try:
+                with redirect_stdout(output), redirect_stderr(errors):
+                    self._compile(
+                        os.path.abspath(input_file),
+                        format_key,
+                        request.get('theme'),
+                        response)
+
+                response['ok'] = True
+            except Exception as e:
+                response['error'] = str(e)
+
+        response['log'] = output.getvalue().splitlines()
+        response['warnings'] = errors.getvalue().splitlines()
+
+        return response
+
+    def _compile(
+            self,
+            input_file: str,
+            format_key: Optional[str],
+            theme: Optional[str],
+            response: Response):
+        document = compile_document(
+            input_file, self.cache, function_cache=self.function_cache)
+
+        out = StringIO()
+
+        if format_key is not None:
+            # Rendered for the client instead of the document targets
+            action_type = get_type(format_key)
+            action = action_type(
+                document=document,
+                location=None,
+                format_key=format_key,
+                target=OutputStdOut(),
+                options=Empty(),
+                theme=theme)
+            action.dump(out)
+        else:
+            files: List[str] = []
+
+            for action in document.actions:
+                if (isinstance(action, OutputAction)
+                        and isinstance(action.target, OutputStdOut)):
+                    action.dump(out)
+                else:
+                    action.run()
+
+                    if (isinstance(action, OutputAction)
+                            and isinstance(action.target, OutputFile)):
+                        files.append(action.target.file_path)
+
+            response['files'] = files
+
+        response['output'] = out.getvalue()
+
+
+def parse_request(line: str) -> Request:
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        raise ValueError(f'Invalid request: {e}')
+
+    if not isinstance(request, dict):
+        raise ValueError('Invalid request: expected an object.')
+
+    return request
+
+
+def serve_lines(server: CompileServer, lines: Iterable[str], out: TextIO):
+    for line in lines:
+        if len(line.strip()) == 0:
+            continue
+
+        try:
+            response = server.handle(parse_request(line))
+        except ValueError as e:
+            response = {'id': None, 'ok': False, 'error': str(e)}
+
+        out.write(json.dumps(response) + '\n')
+        out.flush()
+
+
+def serve_stdio(server: CompileServer):
+    serve_lines(server, sys.stdin, sys.stdout)
+
+
+def serve_socket(server: CompileServer, socket_path: str):
+    class Handler(socketserver.StreamRequestHandler):
+
+        def handle(self):
+            lines = TextIOWrapper(self.rfile, encoding='utf-8')
+            out = TextIOWrapper(self.wfile, encoding='utf-8')
+
+            serve_lines(server, lines, out)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    # A thread per client keeps its connection open between requests
+    with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as s:
+        logger.info(f'Serving on {see(socket_path)}...')
+
+        try:
+            s.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
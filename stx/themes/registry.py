@@ -1,27 +1,44 @@
-from typing import Any
+from typing import Any, Callable, Dict
 
-from stx.themes.built_in.classic_html import classic_theme
+from stx.themes.built_in.classic_html import load_classic_theme
 
-_themes = {}
+_themes: Dict[str, Any] = {}
+
+# Themes whose assets are loaded the first time they are chosen
+_theme_loaders: Dict[str, Callable[[], Any]] = {}
 
 
 def register_theme(name: str, output_format: str, theme: Any, override=False):
+    register_theme_loader(name, output_format, lambda: theme, override)
+
+
+def register_theme_loader(
+        name: str,
+        output_format: str,
+        loader: Callable[[], Any],
+        override=False):
     key = f'{name}/{output_format}'
 
-    if not override and key in _themes:
+    if not override and (key in _themes or key in _theme_loaders):
         raise Exception(f'Theme is already registered: {name}')
 
-    _themes[key] = theme
+    _themes.pop(key, None)
+    _theme_loaders[key] = loader
 
 
 def get_theme(name: str, output_format: str) -> Any:
     key = f'{name}/{output_format}'
 
     if key not in _themes:
-        raise Exception(f'Theme `{name}` not found for '
-                        f'the `{output_format}` format.')
+        loader = _theme_loaders.pop(key, None)
+
+        if loader is None:
+            raise Exception(f'Theme `{name}` not found for '
+                            f'the `{output_format}` format.')
+
+        _themes[key] = loader()
 
     return _themes[key]
 
 
-register_theme('classic', 'html', classic_theme)
+register_theme_loader('classic', 'html', load_classic_theme)
@@ -0,0 +1,54 @@
+import threading
+import time
+from typing import Callable, Optional
+
+
+class DebouncedTask:
+
+    def __init__(self, task: Callable[[], None], delay: float):
+        self.task = task
+        self.delay = delay
+        self._condition = threading.Condition()
+        self._deadline: Optional[float] = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def trigger(self):
+        with self._condition:
+            # Triggers inside the delay are coalesced into one run
+            self._deadline = time.monotonic() + self.delay
+            self._condition.notify()
+
+    def is_superseded(self) -> bool:
+        # The task was triggered again after the current run started
+        with self._condition:
+            return self._deadline is not None
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+
+        self._thread.join()
+
+    def _run(self):
+        while self._wait():
+            self.task()
+
+    def _wait(self) -> bool:
+        with self._condition:
+            while not self._closed:
+                if self._deadline is None:
+                    self._condition.wait()
+                    continue
+
+                remaining = self._deadline - time.monotonic()
+
+                if remaining <= 0:
+                    self._deadline = None
+                    return True
+
+                self._condition.wait(remaining)
+
+        return False
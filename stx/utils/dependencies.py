@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, List, Set, TextIO
+
+INCLUDE = 'include'
+EMBED = 'embed'
+GRAMMAR = 'grammar'
+IMAGE = 'image'
+STYLESHEET = 'stylesheet'
+
+# Dependencies whose content is read, the others are only referenced
+INPUT_KINDS = {INCLUDE, EMBED, GRAMMAR}
+
+
+class DependencyGraph:
+
+    def __init__(self, root: str):
+        self.root = root
+        self.edges: Dict[str, Dict[str, str]] = {}
+
+    def add(self, source: str, target: str, kind: str):
+        self.edges.setdefault(source, {})[target] = kind
+
+    def get_targets(self, source: str) -> Dict[str, str]:
+        return self.edges.get(source, {})
+
+    def get_files(self, kinds: Iterable[str] = INPUT_KINDS) -> List[str]:
+        kinds = set(kinds)
+        files = [self.root]
+        visited: Set[str] = {self.root}
+
+        # Breadth-first, so files are listed close to the reading order
+        for source in files:
+            for target, kind in self.get_targets(source).items():
+                if kind in kinds and target not in visited:
+                    visited.add(target)
+                    files.append(target)
+
+        return files
+
+    def write_makefile(self, out: TextIO, targets: List[str]):
+        files = [escape_make_path(f) for f in self.get_files()]
+
+        out.write(' '.join(escape_make_path(t) for t in targets) + ':')
+
+        for file in files:
+            out.write(f' \\\n  {file}')
+
+        out.write('\n')
+
+        # Removed dependencies do not break the build
+        for file in files[1:]:
+            out.write(f'\n{file}:\n')
+
+
+def escape_make_path(file_path: str) -> str:
+    return (file_path
+            .replace('$', '$$')
+            .replace('#', '\\#')
+            .replace(' ', '\\ '))
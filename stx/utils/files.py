@@ -1,5 +1,9 @@
+from __future__ import annotations
+
+import hashlib
+import os
 from os import path, walk
-from typing import Iterator, List
+from typing import BinaryIO, Iterator, List, Tuple
 
 
 def resolve_path(base_path: str, relative_path: str) -> str:
@@ -28,3 +32,50 @@ def resolve_include_files(include_path: str, source_path: str) -> List[str]:
         return [file_path for file_path in sorted(walk_files(target_path))]
 
     return [target_path]
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def hash_file(file_path: str) -> str:
+    with open(file_path, mode='rb') as stream:
+        return hash_bytes(stream.read())
+
+
+class FileSignature:
+
+    def __init__(self, mtime: int, size: int, digest: str):
+        self.mtime = mtime
+        self.size = size
+        self.digest = digest
+
+    @staticmethod
+    def from_file(file_path: str) -> FileSignature:
+        with open(file_path, mode='rb') as stream:
+            return FileSignature.from_stream(stream)[0]
+
+    @staticmethod
+    def from_stream(stream: BinaryIO) -> Tuple[FileSignature, bytes]:
+        # Signs the exact bytes that are returned, not the file afterwards
+        mtime = os.fstat(stream.fileno()).st_mtime_ns
+        data = stream.read()
+
+        return FileSignature(mtime, len(data), hash_bytes(data)), data
+
+    def matches(self, file_path: str) -> bool:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+
+        if stat.st_size != self.size:
+            return False
+        elif stat.st_mtime_ns == self.mtime:
+            return True
+        elif hash_file(file_path) == self.digest:
+            # Touched but not modified
+            self.mtime = stat.st_mtime_ns
+            return True
+
+        return False
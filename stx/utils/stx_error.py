@@ -1,10 +1,11 @@
 from typing import Optional
 
-from stx.compiling.reading.location import Location
+from stx.compiling.reading.location import PackedLocation, expand_location
 from stx.utils.thread_context import context
 
 
-def generate_error_message(message: str, location: Optional[Location]):
+def generate_error_message(
+        message: str, location: Optional[PackedLocation]):
     if location is None:
         reader = context.parser
 
@@ -15,11 +16,11 @@ def generate_error_message(message: str, location: Optional[Location]):
     if location is None:
         return message
 
-    return location.decorate(message)
+    return expand_location(location).decorate(message)
 
 
 class StxError(Exception):
 
     # TODO make location required
-    def __init__(self, message: str, location: Location = None):
+    def __init__(self, message: str, location: PackedLocation = None):
         super().__init__(generate_error_message(message, location))
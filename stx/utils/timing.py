@@ -0,0 +1,9 @@
+class Timing:
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.seconds += seconds
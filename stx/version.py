@@ -0,0 +1,10 @@
+from importlib import metadata
+
+app_name = 'stx'
+
+try:
+    app_version = metadata.version(app_name)
+except metadata.PackageNotFoundError:
+    app_version = '?'
+
+app_title = f'{app_name} {app_version}'
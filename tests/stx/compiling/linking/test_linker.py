@@ -0,0 +1,62 @@
+from stx.components import Composite, Section, Table, LinkText
+from stx.components import TableOfContents
+from tests.utils import compile_text
+
+
+def test_link_document():
+    document = compile_text('<toc>\n\n'
+                            '= One\n\n'
+                            '|- a | b\n\n'
+                            '== Sub\n\n'
+                            'See [Two] and [missing].\n\n'
+                            '= Two\n\n'
+                            '|- c | d\n')
+
+    assert isinstance(document.content, Composite)
+
+    _, one, two = document.content.components
+    sub = one.content.components[1]
+
+    assert isinstance(one, Section) and one.number == '1.'
+    assert isinstance(sub, Section) and sub.number == '1.1.'
+    assert isinstance(two, Section) and two.number == '2.'
+    assert one.get_main_ref() == 'one'
+    assert two.get_main_ref() == 'two'
+
+    tables = [c for c in document.content.walk() if isinstance(c, Table)]
+    links = [c for c in document.content.walk() if isinstance(c, LinkText)]
+    toc = next(c for c in document.content.walk()
+               if isinstance(c, TableOfContents))
+
+    assert [table.number for table in tables] == ['1.', '2.']
+    assert [link.invalid for link in links] == [False, True]
+    assert [e.number for e in toc.elements] == ['1.', '2.']
+
+
+def test_deferred_functions():
+    document = compile_text('<toc>\n\n'
+                            '= One\n\n'
+                            '{{{ warning\n'
+                            'Warning with <br> break.\n'
+                            '}}}\n')
+
+    toc = next(c for c in document.content.walk()
+               if isinstance(c, TableOfContents))
+
+    assert [e.title for e in toc.elements] == ['One']
+    assert document.function_timings['toc'].count == 1
+    assert document.function_timings['warning'].count == 1
+    assert document.function_timings['br'].count == 1
+
+
+def test_repeated_references():
+    document = compile_text('= One\n\n'
+                            '= One\n\n'
+                            '= One 1\n\n'
+                            '= One\n')
+
+    sections = [c for c in document.content.walk()
+                if isinstance(c, Section)]
+
+    assert [s.get_main_ref() for s in sections] == [
+        'one', 'one-1', 'one-1-1', 'one-2']
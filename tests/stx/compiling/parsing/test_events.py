@@ -0,0 +1,111 @@
+import tempfile
+
+from stx.compiling.parsing.events import ATTRIBUTE, BEGIN, BLOCK, CONTAINER
+from stx.compiling.parsing.events import END, HEADING, LITERAL, SECTION
+from stx.compiling.parsing.events import TEXT
+from stx.compiling.parsing.events import build_component, scan_file
+from stx.components import ListBlock, Section, Table
+
+TEXT_WITH_EVENTS = '''\
+@ref: intro
+= Intro with a
+  long heading
+
++++
+= Not a heading
++++
+
+- a
+
+  more a
+- b
+
+{{{ note
+== Inside
+}}}
+
+|= A | B
+|- 1 | 2
+:^ Caption
+'''
+
+
+def scan_text(text: str):
+    with tempfile.NamedTemporaryFile(suffix='.stx') as file:
+        with open(file.name, mode='w') as w:
+            w.write(text)
+
+        return scan_file(file.name)
+
+
+def test_scan_events():
+    stream = scan_text(TEXT_WITH_EVENTS)
+
+    events = [
+        (stream.kinds[i], stream.tags[i], stream.levels[i])
+        for i in range(len(stream))
+    ]
+
+    assert events == [
+        (TEXT, ATTRIBUTE, 0),
+        (BEGIN, SECTION, 1),
+        (TEXT, HEADING, 1),
+        (TEXT, LITERAL, 0),
+        (TEXT, BLOCK, 0),
+        (BEGIN, CONTAINER, 1),
+        (BEGIN, SECTION, 2),
+        (TEXT, HEADING, 2),
+        (END, SECTION, 2),
+        (END, CONTAINER, 1),
+        (TEXT, BLOCK, 0),
+        (END, SECTION, 1),
+    ]
+    assert [i for i in range(len(stream)) if stream.targets[i]] == [10]
+    assert stream.find_end(5) == 9
+    assert stream.get_text(0) == '@ref: intro\n'
+    assert stream.get_text(2) == 'Intro with a\n  long heading\n'
+    assert stream.get_text(4) == '- a\n\n  more a\n- b\n'
+
+
+def test_build_components():
+    stream = scan_text(TEXT_WITH_EVENTS)
+
+    section = build_component(stream, 1)
+
+    assert isinstance(section, Section)
+    assert section.ref == 'intro'
+    assert section.heading.get_text() == 'Intro with a\nlong heading\n'
+
+    heading = build_component(stream, 2)
+
+    assert heading.get_text() == section.heading.get_text()
+    assert heading.location == section.heading.location
+
+    list_block = build_component(stream, 4)
+
+    assert isinstance(list_block, ListBlock)
+    assert len(list_block.items) == 2
+
+    table = build_component(stream, 10)
+
+    assert isinstance(table, Table)
+    assert len(table.rows) == 2
+    assert table.caption.get_text() == 'Caption'
+
+
+def test_scan_targets():
+    stream = scan_text('Text.\n\n'
+                       '- a\n\n'
+                       '  |- b | c\n\n'
+                       '::Caption\n'
+                       '+++\n'
+                       'x\n'
+                       '+++\n\n'
+                       '@ref: box\n'
+                       '{{{\n'
+                       'Text.\n'
+                       '}}}\n')
+
+    assert [stream.tags[i] for i in range(len(stream))] == [
+        BLOCK, BLOCK, LITERAL, ATTRIBUTE, CONTAINER, BLOCK, CONTAINER]
+    assert list(stream.targets) == [0, 1, 1, 0, 1, 0, 0]
@@ -0,0 +1,17 @@
+from stx.components import Paragraph, PlainText, StyledText
+from tests.utils import compile_text
+
+
+def test_paragraph_text_runs():
+    paragraph = compile_text('Some *strong* text.\nA \\*b\\* c... d').content
+
+    assert isinstance(paragraph, Paragraph)
+
+    plain, styled, rest = paragraph.contents[:3]
+
+    assert isinstance(plain, PlainText)
+    assert plain.content == 'Some '
+    assert isinstance(styled, StyledText)
+    assert styled.get_text() == 'strong'
+    assert rest.content == ' text.\nA *b* c'
+    assert paragraph.get_text() == 'Some strong text.\nA *b* c… d'
@@ -0,0 +1,249 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from stx.app import process_file
+from stx.compiling.parsing.units import Unit, UnitCache
+from stx.compiling.reading.location import get_file_id, get_location_file
+from stx.compiling.reading.location import get_location_position
+from stx.compiling.reading.location import pack_location
+from stx.components import FunctionCall, Literal
+from stx.data_notation.values import Empty
+from stx.outputs.json.serializer import document_to_json
+from tests.utils import write_file
+
+
+def test_units_are_reused():
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'chapters'))
+
+        index_path = os.path.join(root, 'index.stx')
+        chapter1_path = os.path.join(root, 'chapters', '1.stx')
+        chapter2_path = os.path.join(root, 'chapters', '2.stx')
+
+        write_file(index_path, 'Intro.\n\n#include: chapters\n\n= End\n')
+        write_file(chapter1_path, '= One\n\nText *1*.\n\n== Sub\n\n- a\n')
+        write_file(chapter2_path, '= Two\n\n- b\n- c\n')
+
+        expected = document_to_json(process_file(index_path))
+
+        cache = UnitCache()
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+        assert cache.load(chapter1_path).complete
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+        write_file(chapter2_path, '= Two\n\nChanged.\n')
+
+        assert cache.load(chapter2_path) is None
+
+        expected = document_to_json(process_file(index_path))
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+
+class EditingCache(UnitCache):
+
+    def __init__(self, file_path: str, text: str, *args):
+        super().__init__(*args)
+        self.file_path = file_path
+        self.text = text
+
+    def save(self, unit: Unit):
+        # As if the file was edited while the unit was being parsed
+        if unit.file_path == self.file_path:
+            write_file(self.file_path, self.text)
+
+        super().save(unit)
+
+
+def test_units_keep_the_signature_of_the_parsed_text():
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'chapters'))
+
+        index_path = os.path.join(root, 'index.stx')
+        chapter_path = os.path.join(root, 'chapters', '1.stx')
+
+        write_file(index_path, '#include: chapters\n')
+        write_file(chapter_path, '= Old\n')
+
+        cache = EditingCache(chapter_path, '= New\n')
+
+        process_file(index_path, cache)
+
+        assert cache.load(chapter_path) is None
+
+        expected = document_to_json(process_file(index_path))
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+
+def test_units_depending_on_previous_file():
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'items'))
+
+        index_path = os.path.join(root, 'index.stx')
+
+        write_file(index_path, '#include: items\n')
+        write_file(os.path.join(root, 'items', '1.stx'), '- a\n')
+        write_file(os.path.join(root, 'items', '2.stx'), '- b\n')
+
+        expected = document_to_json(process_file(index_path))
+
+        cache = UnitCache()
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+        assert len(expected['content']['items']) == 2
+
+
+def test_units_are_persisted():
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'chapters'))
+
+        index_path = os.path.join(root, 'index.stx')
+        chapter_path = os.path.join(root, 'chapters', '1.stx')
+        cache_dir = os.path.join(root, '.stx-cache')
+
+        write_file(index_path, '#include: chapters\n')
+        write_file(chapter_path, '= One\n\nText.\n')
+
+        expected = document_to_json(process_file(index_path))
+
+        process_file(index_path, UnitCache(cache_dir, '1.0'))
+
+        assert len(os.listdir(cache_dir)) == 1
+        assert UnitCache(cache_dir, '1.0').load(chapter_path) is not None
+        assert UnitCache(cache_dir, '2.0').load(chapter_path) is None
+
+        cache = UnitCache(cache_dir, '1.0')
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+        write_file(chapter_path, '= One\n\nChanged.\n')
+
+        assert UnitCache(cache_dir, '1.0').load(chapter_path) is None
+
+
+def test_units_are_persisted_under_the_parsed_text():
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'chapters'))
+
+        index_path = os.path.join(root, 'index.stx')
+        chapter_path = os.path.join(root, 'chapters', '1.stx')
+        cache_dir = os.path.join(root, '.stx-cache')
+
+        write_file(index_path, '#include: chapters\n')
+        write_file(chapter_path, '= Old\n')
+
+        cache = EditingCache(chapter_path, '= New\n', cache_dir, '1.0')
+
+        process_file(index_path, cache)
+
+        assert UnitCache(cache_dir, '1.0').load(chapter_path) is None
+
+        expected = document_to_json(process_file(index_path))
+        cache = UnitCache(cache_dir, '1.0')
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+        # The first entry was stored under the old text
+        write_file(chapter_path, '= Old\n')
+
+        assert UnitCache(cache_dir, '1.0').load(chapter_path) is not None
+
+
+def test_units_are_parsed_in_parallel():
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'chapters'))
+
+        index_path = os.path.join(root, 'index.stx')
+
+        write_file(index_path, '#include: chapters\n\n- end\n')
+
+        for n in range(4):
+            write_file(
+                os.path.join(root, 'chapters', f'{n}.stx'),
+                f'= Chapter {n}\n\nText {n}.\n\n== Sub {n}\n')
+
+        expected = document_to_json(process_file(index_path))
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            document = process_file(index_path, executor=executor)
+
+        assert document_to_json(document) == expected
+
+
+def test_units_are_relocated():
+    get_file_id('unit.stx')
+
+    unit = Unit('unit.stx')
+    argument = Literal(pack_location(0, 7), 'text')
+    unit.components = [
+        FunctionCall(pack_location(1, 3), False, 'code', Empty(), argument)
+    ]
+
+    # As if it was pickled by a process with other file ids
+    state = dict(unit.__dict__, file_paths=['other.stx', 'unit.stx'])
+    loaded = Unit.__new__(Unit)
+    loaded.__setstate__(state)
+
+    call = loaded.components[0]
+
+    assert get_location_file(call.location) == 'unit.stx'
+    assert get_location_position(call.location) == 3
+    assert get_location_file(call.argument.location) == 'other.stx'
+    assert get_location_position(call.argument.location) == 7
+
+
+def test_units_are_spliced_around_dependent_files(capsys):
+    with tempfile.TemporaryDirectory() as root:
+        os.mkdir(os.path.join(root, 'chapters'))
+
+        index_path = os.path.join(root, 'index.stx')
+
+        write_file(index_path, '#include: chapters\n\n= End\n')
+        write_file(os.path.join(root, 'chapters', '1.stx'), '= One\n\n- a\n')
+        write_file(os.path.join(root, 'chapters', '2.stx'), '- b\n')
+        write_file(os.path.join(root, 'chapters', '3.stx'), '= Three\n')
+        write_file(os.path.join(root, 'chapters', '4.stx'), '= Four\n')
+        write_file(os.path.join(root, 'chapters', '5.stx'), '== Sub\n')
+
+        expected = document_to_json(process_file(index_path))
+
+        cache = UnitCache()
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            document = process_file(index_path, UnitCache(), executor)
+
+        assert document_to_json(document) == expected
+
+        capsys.readouterr()
+
+        assert document_to_json(process_file(index_path, cache)) == expected
+
+        loaded = [
+            os.path.basename(line.rstrip('.'))
+            for line in capsys.readouterr().out.splitlines()
+            if line.startswith('Loading file')
+        ]
+
+        # Only the files that continue each other are read again
+        assert '3.stx' not in ''.join(loaded)
+        assert len(loaded) == 5
+
+
+def test_units_are_bounded():
+    with tempfile.TemporaryDirectory() as root:
+        cache = UnitCache(max_size=2)
+        file_paths = [os.path.join(root, f'{n}.stx') for n in range(3)]
+
+        for file_path in file_paths:
+            write_file(file_path, '= Chapter\n')
+
+            cache.save(Unit(file_path))
+
+        assert len(cache) == 2
+        assert cache.load(file_paths[0]) is None
+        assert cache.load(file_paths[2]) is not None
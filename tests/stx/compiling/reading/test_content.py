@@ -0,0 +1,75 @@
+import pytest
+
+from stx.compiling.marks import not_inline_mark_matcher
+from stx.compiling.reading.content import Content
+from stx.compiling.reading.location import expand_location
+from stx.compiling.reading.location import get_location_file
+from stx.utils.stx_error import StxError
+
+
+def test_read_until():
+    content = Content('abc def\nghi', 'test')
+
+    assert content.read_until([' ', '\n']) == 'abc'
+    assert content.read_until(['\n'], max_length=2) == ' d'
+    assert content.read_until(['\n'], consume_last=True) == 'ef\n'
+    assert content.read_until(['\n']) == 'ghi'
+    assert content.peek() is None
+
+
+def test_read_line():
+    content = Content('  a\n\n   b\nc', 'test')
+
+    assert content.read_line(2) == 'a\n'
+    assert content.read_line(2) == '\n'
+    assert content.read_line(2) == ' b\n'
+    assert content.read_line(2) is None
+    assert content.position == 10
+    assert content.read_line(0) == 'c'
+    assert content.read_line(0) is None
+
+
+def test_location():
+    content = Content('ab\ncd\n\nef', 'test')
+
+    position0 = content.position
+
+    content.read_until(['f'])
+
+    packed = content.get_location()
+    location = expand_location(packed)
+
+    assert get_location_file(packed) == 'test'
+    assert location.line == 3
+    assert location.column == 1
+    assert location.position == 8
+    assert str(location) == 'test @ Line 4, Column 2'
+
+    content.go_back(position0)
+
+    assert content.line == 0
+    assert content.column == 0
+
+
+def test_expect_end_of_line():
+    content = Content('a \t\nb c', 'test')
+
+    content.move_next()
+    content.expect_end_of_line()
+
+    assert content.position == 4
+
+    content.move_next()
+
+    with pytest.raises(StxError):
+        content.expect_end_of_line()
+
+    assert content.position == 5
+
+
+def test_view_bounds_tokens_and_marks():
+    content = Content('a ==\n', 'test').view(2, 3)
+
+    assert not content.test_any(['=='])
+    assert content.test_any(['='])
+    assert content.test_mark(not_inline_mark_matcher) == '='
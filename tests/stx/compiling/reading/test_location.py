@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+from stx.compiling.reading import location
+from stx.compiling.reading.line_index import LineIndex
+from stx.compiling.reading.location import expand_location, get_file_id
+from stx.compiling.reading.location import keep_line_indexes
+from stx.compiling.reading.location import pack_location
+
+
+def test_line_indexes_are_bounded():
+    with tempfile.TemporaryDirectory() as root:
+        file_paths = []
+
+        for n in range(location.MAX_LINE_INDEXES + 1):
+            file_path = os.path.join(root, f'{n}.stx')
+            text = '\n' * n + 'x'
+
+            with open(file_path, mode='w') as stream:
+                stream.write(text)
+
+            get_file_id(file_path, LineIndex(text))
+            file_paths.append(file_path)
+
+        assert len(location._line_indexes) <= location.MAX_LINE_INDEXES
+
+        # The dropped lines are read again from the file
+        first = expand_location(pack_location(get_file_id(file_paths[0]), 0))
+        last = expand_location(pack_location(
+            get_file_id(file_paths[-1]), location.MAX_LINE_INDEXES))
+
+        assert (first.line, first.column) == (0, 0)
+        assert (last.line, last.column) == (location.MAX_LINE_INDEXES, 0)
+
+
+def test_line_indexes_are_kept_by_the_compile():
+    with tempfile.TemporaryDirectory() as root:
+        file_path = os.path.join(root, 'index.stx')
+        text = 'a\nb\nc'
+
+        with open(file_path, mode='w') as stream:
+            stream.write(text)
+
+        with keep_line_indexes():
+            packed = pack_location(get_file_id(file_path, LineIndex(text)), 4)
+
+            location._line_indexes.clear()
+
+            # The file changed after it was read by the compile
+            with open(file_path, mode='w') as stream:
+                stream.write('abcdef')
+
+            assert expand_location(packed).line == 2
+
+        os.remove(file_path)
+        location._line_indexes.clear()
+
+        missing = expand_location(packed)
+
+        assert missing.line is None
+        assert str(missing) == f'{file_path} @ Unknown line'
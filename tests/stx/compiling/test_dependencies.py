@@ -0,0 +1,38 @@
+import os
+import tempfile
+from io import StringIO
+
+from stx.app import process_file
+from stx.utils.dependencies import IMAGE, INCLUDE, STYLESHEET
+from tests.utils import write_file
+
+
+def test_dependencies():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, 'index.stx')
+        parts_path = os.path.join(temp_dir, 'parts')
+        a_path = os.path.join(parts_path, 'a.stx')
+        snippet_path = os.path.join(temp_dir, 'snippet.txt')
+
+        write_file(index_path, '#stylesheets: (`style.css`, `https://x/y.css`)'
+                               '\n\n'
+                               '#include: parts\n')
+        write_file(a_path, 'Text <img: `pic.png`>.\n\n'
+                           '<embed: `snippet.txt`>\n')
+        write_file(snippet_path, 'Snippet.\n')
+
+        graph = process_file(index_path).dependencies
+        out = StringIO()
+
+        graph.write_makefile(out, ['out.html'])
+
+        assert graph.get_files() == [
+            index_path, parts_path, a_path, snippet_path]
+        assert graph.get_targets(index_path) == {
+            os.path.join(temp_dir, 'style.css'): STYLESHEET,
+            parts_path: INCLUDE,
+        }
+        assert graph.get_targets(a_path)[
+            os.path.join(temp_dir, 'pic.png')] == IMAGE
+        assert out.getvalue().startswith(f'out.html: \\\n  {index_path} \\')
+        assert out.getvalue().endswith(f'\n{snippet_path}:\n')
@@ -0,0 +1,17 @@
+from stx.compiling.marks import MarkMatcher, all_mark_matcher
+
+
+def test_mark_matcher():
+    matcher = MarkMatcher(['===', '==', '=', '|=', '|'])
+
+    assert matcher.match('== Title', 0) == '=='
+    assert matcher.match('a |= b', 2) == '|='
+    assert matcher.match('a | b', 2) == '|'
+    assert matcher.match('a | b', 1) is None
+    assert matcher.match('=', 1) is None
+    assert matcher.first_chars == '=|'
+
+
+def test_mark_matcher_keeps_order():
+    assert all_mark_matcher.match('...', 0) == '.'
+    assert all_mark_matcher.match('{{{', 0) == '{{{'
@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from stx.compiling.compiler import compile_document
+from stx.compiling.outline import compile_outline
+from stx.components import TableOfContents
+from stx.functions.built_in import generate_toc
+from stx.outputs.json.serializer import toc_elements_to_json
+from tests.utils import write_file
+
+
+def test_outline_matches_the_document():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = os.path.join(temp_dir, 'index.stx')
+
+        write_file(index_path, '#title: Book\n\n'
+                               'Intro.\n\n'
+                               '@ref: first\n'
+                               '= One\n\n'
+                               '|- a | b\n\n'
+                               '{{{\n'
+                               '== Boxed\n\n'
+                               'Text.\n'
+                               '}}}\n\n'
+                               '{{{ info\n'
+                               '== Hidden\n'
+                               '}}}\n\n'
+                               '#include: parts\n\n'
+                               '= Last\n\n'
+                               ':: Caption\n'
+                               '<img: (src: `a.png`, alt: `A`)>\n')
+        write_file(os.path.join(temp_dir, 'parts', '1.stx'),
+                   '== Part\n\n- a\n- b\n\n= Two\n\n|- a | b\n')
+
+        outline = assert_outline_matches(index_path)
+
+        assert outline.document.title == 'Book'
+        assert [e.number for e in outline.toc.elements] == ['1.', '2.', '3.']
+        assert {'first', 'a-b', 'a-b-1', 'caption'} <= outline.refs
+
+        # Indented headings close the items and the sections around them
+        write_file(index_path, '= A\n\n- item\n  = X\n\n= B\n')
+
+        outline = assert_outline_matches(index_path)
+
+        assert [e.number for e in outline.toc.elements] == ['1.', '2.', '3.']
+
+        write_file(index_path, '= A\n\n- a\n  - b\n    = deep\n= B\n')
+
+        assert_outline_matches(index_path)
+
+
+def assert_outline_matches(index_path: str):
+    document = compile_document(index_path)
+    toc = TableOfContents(None, None)
+    refs = {
+        ref
+        for component in document.content.walk(include_self=True)
+        for ref in component.get_refs()
+    }
+
+    generate_toc(document, toc)
+
+    outline = compile_outline(index_path)
+
+    assert (toc_elements_to_json(outline.toc.elements)
+            == toc_elements_to_json(toc.elements))
+    assert outline.refs == refs
+
+    return outline
@@ -0,0 +1,45 @@
+import pickle
+import sys
+
+from stx.compiling.reading.location import Location
+from stx.components import Component, Composite, ElementReference, PlainText
+
+
+def test_walk():
+    a = PlainText(None, 'a')
+    b = PlainText(None, 'b')
+    inner = Composite(None, [b])
+    root = Composite(None, [a, inner])
+
+    assert list(root.walk()) == [a, inner, b]
+    assert list(root.walk(include_self=True)) == [root, a, inner, b]
+    assert list(root.walk(PlainText)) == [a, b]
+    assert list(root.walk_post_order()) == [a, b, inner]
+    assert list(root.walk_post_order(Composite, include_self=True)) == [
+        inner, root]
+
+
+def test_walk_deep_tree():
+    root = leaf = PlainText(None, 'leaf')
+
+    for _ in range(sys.getrecursionlimit() * 2):
+        root = Composite(None, [root])
+
+    assert list(root.walk(PlainText)) == [leaf]
+    assert list(root.walk_post_order())[0] is leaf
+
+
+def test_slots():
+    types = [Location, ElementReference, *Component.__subclasses__()]
+
+    for compact_type in types:
+        assert '__dict__' not in dir(compact_type), compact_type
+
+    text = PlainText(None, 'text')
+    text.add_ref('r')
+
+    copy = pickle.loads(pickle.dumps(Composite(None, [text])))
+
+    assert isinstance(copy.components[0], Component)
+    assert copy.components[0].content == 'text'
+    assert copy.components[0].get_refs() == ['r']
@@ -0,0 +1,105 @@
+import os
+import tempfile
+
+from stx.app import process_file
+from stx.compiling.reading.location import expand_location, pack_location
+from stx.components import CodeBlock, FunctionCall, Literal, Section
+from stx.data_notation.values import Empty
+from stx.functions import registry
+from stx.functions.built_in import get_embed_revision, resolve_embed
+from stx.functions.registry import FunctionCache
+from stx.outputs.json.serializer import document_to_json
+
+
+def test_pure_function_cache():
+    cache = FunctionCache()
+    text = ('{{{ code\n'
+            'x = 1\n'
+            '}}}\n\n'
+            '{{{ code\n'
+            'x = 1\n'
+            '}}}\n')
+
+    with tempfile.NamedTemporaryFile() as file:
+        with open(file.name, mode='w') as w:
+            w.write(text)
+
+        expected = document_to_json(process_file(file.name))
+        document = process_file(file.name, function_cache=cache)
+
+    assert len(cache) == 1
+    assert document_to_json(document) == expected
+
+    first, second = [c for c in document.content.walk()
+                     if isinstance(c, CodeBlock)]
+
+    assert first is not second
+    assert [expand_location(first.location).line,
+            expand_location(second.location).line] == [0, 4]
+
+
+def get_literal_texts(document):
+    return [c.text for c in document.content.walk()
+            if isinstance(c, Literal)]
+
+
+def test_embed_is_cached_until_the_file_changes():
+    cache = FunctionCache()
+    calls = []
+
+    def counting_embed(document, call):
+        calls.append(call)
+        return resolve_embed(document, call)
+
+    registry.add('embed', counting_embed, override=True,
+                 pure=True, revision=get_embed_revision)
+
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            index_path = os.path.join(root, 'index.stx')
+            snippet_path = os.path.join(root, 'snippet.txt')
+
+            with open(index_path, mode='w') as w:
+                w.write('<embed: `snippet.txt`>\n')
+
+            with open(snippet_path, mode='w') as w:
+                w.write('Old.')
+
+            process_file(index_path, function_cache=cache)
+            document = process_file(index_path, function_cache=cache)
+
+            assert len(calls) == 1
+            assert get_literal_texts(document) == ['Old.']
+            assert snippet_path in document.dependencies.get_files()
+
+            with open(snippet_path, mode='w') as w:
+                w.write('New text.')
+
+            document = process_file(index_path, function_cache=cache)
+
+            assert len(calls) == 2
+            assert get_literal_texts(document) == ['New text.']
+    finally:
+        registry.add('embed', resolve_embed, override=True,
+                     pure=True, revision=get_embed_revision)
+
+
+def test_cached_results_take_the_location_of_the_call():
+    cache = FunctionCache()
+    argument = Literal(pack_location(0, 9), 'text')
+    first = FunctionCall(2, False, 'test', Empty(), argument)
+    second = FunctionCall(7, False, 'test', Empty(), argument)
+
+    result = Section(first.location, 2)
+    result.heading = Literal(first.location, 'Title')
+    result.content = argument
+
+    # The level is the same small int as the location of the first call
+    cache.put(('test',), first, result)
+
+    section = cache.get(('test',), second)
+
+    assert section.location == 7
+    assert section.level == 2
+    assert section.heading.location == 7
+    assert section.content is argument
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+from stx.grammars import registry
+
+
+def test_register_grammar_from_file():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        grammar_path = os.path.join(temp_dir, 'digits.gmt')
+
+        with open(grammar_path, mode='w') as stream:
+            stream.write('digits: number\n\n'
+                         'number = {1 `0-9`}\n')
+
+        registry.cache_directory = os.path.join(temp_dir, 'cache')
+
+        try:
+            registry.register_grammar_from_file('digits', grammar_path,
+                                                'digits')
+            reference = registry.get_grammar('digits')
+            revision = registry.get_revision()
+
+            assert os.listdir(registry.cache_directory) == [reference.digest]
+
+            # An unchanged grammar keeps its reference and tokens
+            registry._compiled.clear()
+            registry.register_grammar_from_file('digits', grammar_path,
+                                                'digits')
+
+            assert registry.get_grammar('digits') is reference
+            assert registry.get_revision() == revision
+
+            nodes = reference.tokenize('a 12')
+
+            assert [node.rule for node in nodes] == [None, 'number']
+            assert reference.tokenize('a 12') == nodes
+        finally:
+            registry.cache_directory = None
@@ -0,0 +1,20 @@
+from io import StringIO
+
+from stx.outputs.html.escaping import write_text
+
+
+def escape(value) -> str:
+    out = StringIO()
+
+    write_text(value, out)
+
+    return out.getvalue()
+
+
+def test_write_text():
+    assert escape(None) == ''
+    assert escape(12) == '12'
+    assert escape('plain text') == 'plain text'
+    assert escape('a < b & "c"') == 'a &lt; b &amp; &quot;c&quot;'
+    assert escape('\t\n\r\x00\x7f') == '\t\n\r&#0;&#127;'
+    assert escape(' €') == '&nbsp;&euro;'
@@ -0,0 +1,32 @@
+import tempfile
+from io import StringIO
+
+from stx.app import process_file
+from stx.outputs.html.serializer import document_to_html, write_html
+from stx.outputs.html.themes import NullHtmlTheme
+
+
+def test_write_html_matches_tree():
+    with tempfile.NamedTemporaryFile(suffix='.stx') as file:
+        with open(file.name, mode='w') as w:
+            w.write('#title: `A & B`\n\n'
+                    '= Section\n\n'
+                    '@ref: intro\n'
+                    'Some *strong* "quoted" text.\n\n'
+                    '- item\n'
+                    '- [[link][intro]]\n\n'
+                    '|= a | b\n'
+                    '|- 1 | 2\n')
+
+        document = process_file(file.name)
+
+    expected = StringIO()
+
+    for tag in document_to_html(document, NullHtmlTheme()):
+        tag.render(expected)
+
+    actual = StringIO()
+
+    write_html(document, NullHtmlTheme(), actual)
+
+    assert actual.getvalue() == expected.getvalue()
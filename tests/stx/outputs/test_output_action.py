@@ -0,0 +1,64 @@
+import os
+import stat
+import tempfile
+
+from stx.app import process_file
+from stx.outputs import OutputFile
+
+
+def test_output_file_is_replaced():
+    with tempfile.TemporaryDirectory() as root:
+        input_path = os.path.join(root, 'index.stx')
+        output_path = os.path.join(root, 'index.json')
+
+        with open(input_path, mode='w') as w:
+            w.write('#output: (format: json, target: `index.json`, '
+                    'buffer: 16)\n\nSome text.\n')
+
+        with open(output_path, mode='w') as w:
+            w.write('old')
+
+        document = process_file(input_path)
+
+        target = document.actions[0].target
+
+        assert isinstance(target, OutputFile)
+        assert target.buffer_size == 16
+        assert sorted(os.listdir(root)) == ['index.json', 'index.stx']
+
+        with open(output_path) as r:
+            assert '"Some text."' in r.read()
+
+
+def test_output_file_keeps_its_mode():
+    with tempfile.TemporaryDirectory() as root:
+        input_path = os.path.join(root, 'index.stx')
+        output_path = os.path.join(root, 'index.json')
+
+        with open(input_path, mode='w') as w:
+            w.write('#output: (format: json, target: `index.json`)\n\n'
+                    'Some text.\n')
+
+        process_file(input_path)
+
+        umask = os.umask(0)
+        os.umask(umask)
+
+        assert stat.S_IMODE(os.stat(output_path).st_mode) == 0o666 & ~umask
+
+        os.chmod(output_path, 0o640)
+
+        process_file(input_path)
+
+        assert stat.S_IMODE(os.stat(output_path).st_mode) == 0o640
+        assert sorted(os.listdir(root)) == ['index.json', 'index.stx']
+
+
+def test_output_file_writes():
+    output_file = OutputFile(os.path.join('docs', 'index.html'))
+    dir_path = os.path.abspath('docs')
+
+    assert output_file.writes(os.path.join(dir_path, 'index.html'))
+    assert output_file.writes(os.path.join(dir_path, '.index.html.x1y.tmp'))
+    assert not output_file.writes(os.path.join(dir_path, 'index.stx'))
+    assert not output_file.writes(os.path.abspath('.index.html.x1y.tmp'))
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from stx.app import build_documents, print_outline, process_file
+from stx.components import Section
+
+STARTUP_CHECK = '''
+import sys
+
+import stx.app
+from stx.grammars import registry as grammars
+from stx.themes import registry as themes
+
+modules = ['watchdog', 'pkg_resources', 'concurrent.futures.process']
+
+print([name for name in modules if name in sys.modules])
+print(len(grammars._compiled), len(themes._themes))
+'''
+
+
+def test_lazy_startup():
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_CHECK],
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True)
+
+    assert result.stdout.splitlines() == ['[]', '0 0']
+
+
+def test_build_documents():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_files = []
+
+        for name in ['a', 'b', 'bad']:
+            input_file = os.path.join(temp_dir, f'{name}.stx')
+
+            with open(input_file, mode='w') as stream:
+                if name == 'bad':
+                    stream.write('{{{\n')
+                else:
+                    stream.write(f'= {name}\n\n'
+                                 f'#output: (format: json,'
+                                 f' target: `{name}.json`)\n')
+
+            input_files.append(input_file)
+
+        for jobs in [None, 2]:
+            summaries = list(build_documents(input_files, False, None, jobs))
+
+            assert [s.input_file for s in summaries] == input_files
+            assert [len(s.outputs) for s in summaries] == [1, 1, 0]
+            assert [s.error is None for s in summaries] == [True, True, False]
+            assert os.path.isfile(os.path.join(temp_dir, 'b.json'))
+
+
+def test_print_outline(capsys):
+    with tempfile.NamedTemporaryFile(suffix='.stx') as file:
+        with open(file.name, mode='w') as stream:
+            stream.write('= One\n\n== Sub\n\nText.\n\n= Two\n')
+
+        print_outline(file.name)
+
+    outline = json.loads(capsys.readouterr().out)
+
+    assert [e['number'] for e in outline['elements']] == ['1.', '2.']
+    assert outline['elements'][0]['elements'][0]['reference'] == 'sub'
+    assert outline['refs'] == ['one', 'sub', 'two']
+
+
+def test_superseded_builds_stop_early():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, 'index.stx')
+
+        with open(input_file, mode='w') as stream:
+            stream.write('= One\n\n'
+                         '#output: (format: json, target: `a.json`)\n')
+
+        document = process_file(input_file, cancelled=lambda: True)
+        section = next(document.content.walk(Section, include_self=True))
+
+        # Neither linked nor rendered
+        assert section.number is None
+        assert not os.path.exists(os.path.join(temp_dir, 'a.json'))
+
+        document = process_file(input_file, cancelled=lambda: False)
+        section = next(document.content.walk(Section, include_self=True))
+
+        assert section.number == '1.'
+        assert os.path.isfile(os.path.join(temp_dir, 'a.json'))
@@ -0,0 +1,37 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from stx.compiling.parsing.units import UnitCache
+from stx.server import CompileServer, serve_lines
+
+
+def test_serve_lines():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = os.path.join(temp_dir, 'index.stx')
+
+        with open(input_file, mode='w') as stream:
+            stream.write('= Title\n\n'
+                         'Text.\n\n'
+                         '#output: (format: json, target: `index.json`)\n')
+
+        requests = [
+            json.dumps({'id': 1, 'file': input_file, 'format': 'json'}),
+            json.dumps({'id': 2, 'file': input_file}),
+            'not json',
+            json.dumps({'id': 3, 'file': os.path.join(temp_dir, 'x.stx')}),
+        ]
+        out = StringIO()
+
+        serve_lines(CompileServer(UnitCache()), requests, out)
+
+        first, second, invalid, missing = [
+            json.loads(line) for line in out.getvalue().splitlines()
+        ]
+
+        assert first['ok'] and 'content' in json.loads(first['output'])
+        assert second['ok']
+        assert second['files'] == [os.path.join(temp_dir, 'index.json')]
+        assert invalid['id'] is None and not invalid['ok']
+        assert missing['id'] == 3 and not missing['ok']
@@ -0,0 +1,40 @@
+import threading
+
+from stx.utils.debounce import DebouncedTask
+
+
+def test_debounced_task():
+    runs = []
+    superseded = []
+    started = threading.Event()
+    resume = threading.Event()
+    done = threading.Event()
+
+    def task():
+        runs.append(len(runs))
+
+        if len(runs) == 1:
+            started.set()
+            resume.wait(5)
+            superseded.append(debounced.is_superseded())
+        else:
+            done.set()
+
+    debounced = DebouncedTask(task, 0.05)
+
+    try:
+        for _ in range(5):
+            debounced.trigger()
+
+        assert started.wait(5)
+
+        # Triggered while running: the current run is outdated
+        debounced.trigger()
+        resume.set()
+
+        assert done.wait(5)
+    finally:
+        debounced.close()
+
+    assert runs == [0, 1]
+    assert superseded == [True]
@@ -0,0 +1,19 @@
+import os
+import tempfile
+
+from stx.app import process_file
+from stx.document import Document
+
+
+def write_file(file_path: str, text: str):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    with open(file_path, mode='w') as stream:
+        stream.write(text)
+
+
+def compile_text(text: str) -> Document:
+    with tempfile.NamedTemporaryFile() as file:
+        write_file(file.name, text)
+
+        return process_file(file.name)